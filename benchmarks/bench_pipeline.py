@@ -0,0 +1,234 @@
+"""
+Pipeline stage benchmark / regression guard.
+
+    python benchmarks/bench_pipeline.py                                  # 100k rows, print timings
+    python benchmarks/bench_pipeline.py --rows 1000000 --json run.json   # save results
+    python benchmarks/bench_pipeline.py --baseline run.json              # compare against a saved run
+
+A synthetic sales dataset (Product / Region / Date / Units_Sold / Revenue,
+plus optional extra numeric and categorical columns, missing values and
+duplicate rows) is written to a temporary CSV and pushed through load →
+clean → analyze → suggest → render. Each stage is timed `--repeat` times
+(median reported) and then run once more under tracemalloc for its peak
+Python memory. With --baseline, a stage that is slower than the baseline by
+more than --threshold (ignoring differences under 10 ms) or uses more
+memory than --mem-threshold fails and the script exits with status 1.
+--render-workers N adds a render_pool stage: the same charts through the
+process pool with its size cutoffs lifted, which is how
+PARALLEL_RENDER_MIN_JOBS / PARALLEL_RENDER_MIN_ROWS are chosen.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+PRODUCTS = ["Laptop", "Phone", "Tablet", "Monitor", "Keyboard", "Mouse", "Headset", "Camera", "Printer", "Router"]
+REGIONS = ["North", "South", "East", "West", "Central"]
+
+
+# ============================================================
+#  Synthetic data
+# ============================================================
+def make_dataset(rows, numeric=0, categorical=0, missing=0.02, duplicates=0.01, seed=0):
+    """Sales-shaped frame with text dates, as it would arrive from a CSV export."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    units = rng.integers(1, 500, rows)
+    df = pd.DataFrame({
+        "Product": rng.choice(PRODUCTS, rows),
+        "Region": rng.choice(REGIONS, rows),
+        "Date": (pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, rows), unit="D"))
+        .strftime("%Y-%m-%d"),
+        "Units_Sold": units,
+        "Revenue": np.round(units * rng.uniform(5, 1500, rows), 2),
+    })
+    for i in range(numeric):
+        df[f"Metric_{i}"] = rng.normal(100, 25, rows).round(3)
+    for i in range(categorical):
+        df[f"Segment_{i}"] = rng.choice([f"S{i}_{k}" for k in range(20 + 10 * i)], rows)
+
+    if missing:
+        for col in df.columns:
+            mask = rng.random(rows) < missing
+            df[col] = df[col].astype(object).where(~mask, None) if df[col].dtype == object \
+                else df[col].where(~mask)
+    if duplicates:
+        extra = df.sample(frac=duplicates, random_state=seed)
+        df = pd.concat([df, extra], ignore_index=True)
+    return df
+
+
+# ============================================================
+#  Stages
+# ============================================================
+def build_stages(csv_path, chart_dir, compact, render_workers=1):
+    """Return [(name, func(state) -> rows processed)]; each stage reads its input from state."""
+    from modules.file_handler import FileHandler
+    from modules.data_processor import DataProcessor
+    from modules.analytics_engine import AnalyticsEngine
+
+    processor = DataProcessor()
+    analytics = AnalyticsEngine()
+
+    def load(state):
+        state["raw"] = FileHandler().load_file(csv_path)
+        return len(state["raw"])
+
+    def clean(state):
+        state["clean"] = processor.clean_data(state["raw"], compact=compact)
+        return len(state["clean"])
+
+    def analyze(state):
+        # fresh processor each repeat: a shared one would answer repeats 2+ from its profile cache
+        state["info"] = DataProcessor().analyze_columns(state["clean"])
+        return len(state["clean"])
+
+    def suggest(state):
+        state["specs"] = analytics.suggest_charts(state["info"], df=state["clean"])
+        return len(state["specs"])
+
+    def render(state):
+        paths = analytics.generate_and_save_charts(state["clean"], state["info"], output_dir=chart_dir,
+                                                   specs=state["specs"])
+        return len(state["clean"]) * max(1, len(paths))
+
+    def render_pool(state):
+        import modules.analytics_engine as engine
+        limits = engine.PARALLEL_RENDER_MIN_JOBS, engine.PARALLEL_RENDER_MIN_ROWS
+        engine.PARALLEL_RENDER_MIN_JOBS = engine.PARALLEL_RENDER_MIN_ROWS = 0
+        try:
+            paths = analytics.generate_and_save_charts(state["clean"], state["info"], workers=render_workers,
+                                                       output_dir=chart_dir, specs=state["specs"])
+        finally:
+            engine.PARALLEL_RENDER_MIN_JOBS, engine.PARALLEL_RENDER_MIN_ROWS = limits
+        return len(state["clean"]) * max(1, len(paths))
+
+    stages = [("load", load), ("clean", clean), ("analyze", analyze), ("suggest", suggest), ("render", render)]
+    if render_workers > 1:
+        stages.append(("render_pool", render_pool))
+    return stages
+
+
+def run_stages(stages, repeat):
+    state, results = {}, {}
+    for name, func in stages:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            rows = func(state)
+            timings.append(time.perf_counter() - t0)
+
+        tracemalloc.start()
+        func(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        median = statistics.median(timings)
+        results[name] = {
+            "median_seconds": round(median, 6),
+            "min_seconds": round(min(timings), 6),
+            "rows_per_second": round(rows / median, 1) if median else None,
+            "peak_mb": round(peak / 1024 ** 2, 2),
+        }
+        print(f"  {name:<11} {median * 1000:10.1f} ms   peak {peak / 1024 ** 2:8.1f} MB")
+    return results
+
+
+# ============================================================
+#  Baseline comparison
+# ============================================================
+def compare(results, baseline, threshold, mem_threshold, noise_seconds=0.01):
+    """Return a list of regression messages (empty when everything is within budget)."""
+    failures = []
+    for name, current in results["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        slower = current["median_seconds"] / base["median_seconds"] - 1 if base["median_seconds"] else 0
+        bigger = current["peak_mb"] / base["peak_mb"] - 1 if base["peak_mb"] else 0
+        status = "OK  "
+        if slower > threshold and current["median_seconds"] - base["median_seconds"] > noise_seconds:
+            failures.append(f"{name}: {slower:+.0%} time (limit {threshold:+.0%})")
+            status = "FAIL"
+        if bigger > mem_threshold:
+            failures.append(f"{name}: {bigger:+.0%} peak memory (limit {mem_threshold:+.0%})")
+            status = "FAIL"
+        print(f"[{status}] {name:<11} time {slower:+7.1%}   memory {bigger:+7.1%}")
+    if baseline.get("params") != results["params"]:
+        print("⚠️ Baseline was recorded with different parameters; comparison may be meaningless.")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--numeric", type=int, default=0, help="Extra numeric columns")
+    parser.add_argument("--categorical", type=int, default=0, help="Extra categorical columns")
+    parser.add_argument("--missing", type=float, default=0.02, help="Fraction of missing cells")
+    parser.add_argument("--duplicates", type=float, default=0.01, help="Fraction of duplicated rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compact", action="store_true", help="Clean with compact=True")
+    parser.add_argument("--render-workers", type=int, default=1,
+                        help="Also time rendering through a process pool of this size")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown per stage (0.2 = 20%%)")
+    parser.add_argument("--mem-threshold", type=float, default=0.25, help="Allowed peak-memory growth per stage")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    params = {k: getattr(args, k) for k in ("rows", "numeric", "categorical", "missing", "duplicates",
+                                            "seed", "compact")}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        os.chdir(tmp)  # logs/ and output/ written by the modules stay out of the repo
+        try:
+            os.makedirs("logs", exist_ok=True)
+            csv_path = os.path.join(tmp, "sales.csv")
+            make_dataset(args.rows, args.numeric, args.categorical, args.missing,
+                         args.duplicates, args.seed).to_csv(csv_path, index=False)
+            print(f"Dataset: {args.rows:,} rows → {os.path.getsize(csv_path) / 1024 ** 2:.1f} MB CSV")
+            stages = build_stages(csv_path, os.path.join(tmp, "charts"), args.compact, args.render_workers)
+            results = {
+                "params": params,
+                "environment": {"python": platform.python_version(), "pandas": pd.__version__,
+                                "platform": platform.platform(), "cpus": os.cpu_count()},
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "stages": run_stages(stages, args.repeat),
+            }
+        finally:
+            os.chdir(cwd)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+    if baseline is None:
+        return 0
+    failures = compare(results, baseline, args.threshold, args.mem_threshold)
+    for msg in failures:
+        print(f"Regression: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
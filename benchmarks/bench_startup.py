@@ -0,0 +1,84 @@
+"""
+Start-up time benchmark / regression guard.
+
+    python benchmarks/bench_startup.py                # import-time checks
+    python benchmarks/bench_startup.py --window       # also build the Tk window (needs a display)
+
+Each target runs in a fresh interpreter several times; the median must stay
+under its budget and none of the heavy libraries may be imported eagerly.
+Exits with status 1 on a regression so it can run in CI.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "seaborn"]
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+TARGETS = {
+    "import_dashboard": ("import gui.dashboard", 0.5),
+    "import_cli": ("import cli", 0.3),
+}
+WINDOW_TARGET = ("window", "from gui.dashboard import Dashboard\n"
+                           "app = Dashboard()\n"
+                           "app.root.update()\n"
+                           "app.root.destroy()", 1.0)
+
+
+def measure(body, repeat):
+    """Run body in fresh interpreters; return (median seconds, heavy modules seen)."""
+    code = PROBE.format(body=body, heavy=HEAVY_MODULES)
+    timings, heavy = [], set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return statistics.median(timings), sorted(heavy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--window", action="store_true", help="Also time Dashboard() creation")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all budgets (slow machines)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    targets = [(name, body, budget) for name, (body, budget) in TARGETS.items()]
+    if args.window:
+        targets.append(WINDOW_TARGET)
+
+    results, failed = {}, False
+    for name, body, budget in targets:
+        seconds, heavy = measure(body, args.repeat)
+        budget *= args.scale
+        ok = seconds <= budget and not heavy
+        failed |= not ok
+        results[name] = {"median_seconds": round(seconds, 4), "budget_seconds": budget,
+                         "heavy_imports": heavy, "ok": ok}
+        status = "OK  " if ok else "FAIL"
+        print(f"[{status}] {name:<18} {seconds * 1000:8.1f} ms (budget {budget * 1000:.0f} ms)"
+              + (f"  eager imports: {', '.join(heavy)}" if heavy else ""))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
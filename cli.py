@@ -0,0 +1,143 @@
+"""
+Headless batch entry point.
+
+    python cli.py data/*.csv exports/ --output output/batch --workers 4
+
+Runs FileHandler → DataProcessor → AnalyticsEngine → report for every input
+file and writes a manifest.json describing the results. Never imports tkinter.
+With --chart-cache cache/charts, charts identical to an earlier run's are
+linked from the cache instead of being drawn again.
+
+    python cli.py data.csv --metrics spans.jsonl --prometheus metrics.prom --profile profiles/
+
+records per-stage spans (see modules/instrumentation.py) and optionally
+dumps cProfile stats for slow top-level stages.
+"""
+import os
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import sys
+import glob
+import json
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls", ".json", ".jsonl", ".ndjson",
+                        ".parquet", ".pq", ".feather", ".arrow", ".ipc")
+
+
+def collect_inputs(patterns, recursive=False):
+    """Expand files, directories and glob patterns into a sorted, de-duplicated file list."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            sub = "**" if recursive else ""
+            matches = glob.glob(os.path.join(pattern, sub, "*"), recursive=recursive)
+        else:
+            matches = glob.glob(pattern, recursive=recursive) or [pattern]
+        files += [m for m in matches if os.path.isfile(m) and m.lower().endswith(SUPPORTED_EXTENSIONS)]
+    return sorted(dict.fromkeys(os.path.normpath(f) for f in files))
+
+
+def output_names(files):
+    """
+    Output folder per input: its path relative to the inputs' common folder,
+    without the extension (2024/sales.csv, 2025/sales.csv -> 2024/sales,
+    2025/sales). Inputs that would still collide keep their extension.
+    """
+    if not files:
+        return {}
+    paths = {f: os.path.abspath(f) for f in files}
+    root = os.path.commonpath([os.path.dirname(p) for p in paths.values()])
+    rel = {f: os.path.relpath(p, root) for f, p in paths.items()}
+    stems = [os.path.splitext(r)[0] for r in rel.values()]
+    names = {}
+    for f, r in rel.items():
+        stem, ext = os.path.splitext(r)
+        names[f] = stem if stems.count(stem) == 1 else f"{stem}_{ext.lstrip('.')}"
+    return names
+
+
+def _run_one(filepath, output_root, incremental=False, chart_cache=None, name=None):
+    from modules.pipeline import run_pipeline, run_incremental
+    if incremental:
+        return run_incremental(filepath, output_root=output_root, name=name)
+    return run_pipeline(filepath, output_root=output_root, chart_cache_dir=chart_cache, name=name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data insights pipeline without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Files, directories or glob patterns")
+    parser.add_argument("--output", default="output/batch", help="Root folder for per-file outputs")
+    parser.add_argument("--workers", type=int, default=1, help="Files processed in parallel")
+    parser.add_argument("--recursive", action="store_true", help="Recurse into directories / ** globs")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process rows appended since the previous run (CSV)")
+    parser.add_argument("--manifest", default=None, help="Manifest path (default: <output>/manifest.json)")
+    parser.add_argument("--chart-cache", default=None, metavar="DIR",
+                        help="Reuse identical charts from this render cache instead of re-drawing them")
+    parser.add_argument("--metrics", default=None, help="Append timing spans to this JSON Lines file")
+    parser.add_argument("--prometheus", default=None, help="Write span totals in Prometheus text format")
+    parser.add_argument("--track-memory", action="store_true", help="Record per-span peak memory (slower)")
+    parser.add_argument("--profile", default=None, metavar="DIR", help="Dump cProfile stats for top-level spans")
+    parser.add_argument("--profile-threshold", type=float, default=1.0,
+                        help="Only keep profiles of spans slower than this many seconds")
+    args = parser.parse_args(argv)
+
+    files = collect_inputs(args.inputs, recursive=args.recursive)
+    if not files:
+        print("No supported input files found.", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output, exist_ok=True)
+    metrics_path = args.metrics or (os.path.join(args.output, "metrics.jsonl") if args.prometheus else None)
+    if metrics_path or args.track_memory or args.profile:
+        from modules import instrumentation
+        if metrics_path and os.path.exists(metrics_path) and not args.metrics:
+            os.remove(metrics_path)
+        instrumentation.configure(jsonl_path=metrics_path or "", track_memory=args.track_memory,
+                                  profile_dir=args.profile or "", profile_threshold=args.profile_threshold)
+    started = datetime.now()
+    entries = {}
+    names = output_names(files)
+    if args.workers > 1 and len(files) > 1:
+        from modules.process_pool import pool_context
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=pool_context()) as pool:
+            futures = {pool.submit(_run_one, f, args.output, args.incremental, args.chart_cache, names[f]): f
+                       for f in files}
+            for future in as_completed(futures):
+                f = futures[future]
+                try:
+                    entries[f] = future.result()
+                except Exception as e:
+                    entries[f] = {"input": f, "status": "error", "error": str(e)}
+                print(f"[{entries[f]['status']}] {f}")
+    else:
+        for f in files:
+            entries[f] = _run_one(f, args.output, args.incremental, args.chart_cache, names[f])
+            print(f"[{entries[f]['status']}] {f}")
+
+    results = [entries[f] for f in files]
+    manifest = {
+        "started": started.isoformat(timespec="seconds"),
+        "finished": datetime.now().isoformat(timespec="seconds"),
+        "total": len(results),
+        "succeeded": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "results": results,
+    }
+    manifest_path = args.manifest or os.path.join(args.output, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, default=str)
+    print(f"✅ Manifest written: {manifest_path}")
+    if args.prometheus:
+        from modules import instrumentation
+        totals = instrumentation.totals_from_jsonl(metrics_path) if os.path.exists(metrics_path) else {}
+        instrumentation.write_prometheus(args.prometheus, totals=totals)
+        print(f"✅ Metrics written: {args.prometheus}")
+    return 0 if manifest["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
 import os
-import json
-import pandas as pd
-from modules.file_handler import FileHandler
-from modules.data_processor import DataProcessor
-from modules.analytics_engine import AnalyticsEngine
-from modules.visualizer import Visualizer
-from modules.report_generator import ReportGenerator
+import threading
 from modules.logger import AppLogger
+from modules.dataset_context import DatasetContext
+from gui.task_runner import TaskRunner
 
 
 class StyledButton(tk.Button):
@@ -31,20 +27,69 @@ class Dashboard:
         self.root.geometry("1380x850")
         self.root.configure(bg="#121212")
 
-        # Initialize modules
-        self.file_handler = FileHandler()
-        self.data_processor = DataProcessor()
-        self.analytics = AnalyticsEngine()
-        self.visualizer = Visualizer()
-        self.reporter = ReportGenerator()
+        # Initialize modules (pandas/matplotlib-backed ones are created on first
+        # use, see LAZY MODULES, so the window appears before they are imported)
+        self._services = {}
+        self._services_lock = threading.RLock()
         self.logger = AppLogger("logs/error_log.txt")
+        self.runner = TaskRunner(self.root)
 
-        # Data states
-        self.df = None
-        self.analysis_info = {}
-        self.is_cleaned = False
+        # Data state: the current frame plus everything derived from it
+        self.dataset = DatasetContext()
 
         self.build_main_screen()
+        self.root.after(200, self._prewarm)
+
+    # ============================================================
+    #  LAZY MODULES
+    # ============================================================
+    def _service(self, name, factory):
+        with self._services_lock:
+            if name not in self._services:
+                self._services[name] = factory()
+            return self._services[name]
+
+    @property
+    def cache(self):
+        from modules.dataset_cache import DatasetCache
+        return self._service("cache", DatasetCache)
+
+    @property
+    def file_handler(self):
+        from modules.file_handler import FileHandler
+        return self._service("file_handler", lambda: FileHandler(cache=self.cache))
+
+    @property
+    def data_processor(self):
+        from modules.data_processor import DataProcessor
+        return self._service("data_processor", lambda: DataProcessor(cache=self.cache))
+
+    @property
+    def reporter(self):
+        from modules.report_generator import ReportGenerator
+        return self._service("reporter", ReportGenerator)
+
+    def _prewarm(self):
+        """Import the heavy libraries in the background once the window is up."""
+        def load():
+            try:
+                self.file_handler, self.data_processor, self.reporter
+                import gui.visual_window  # noqa: F401  (matplotlib + TkAgg)
+            except Exception as e:
+                self.logger.log_error("Dashboard.prewarm", str(e))
+        threading.Thread(target=load, name="DashboardPrewarm", daemon=True).start()
+
+    @property
+    def df(self):
+        return self.dataset.df
+
+    @property
+    def is_cleaned(self):
+        return self.dataset.cleaned
+
+    @property
+    def analysis_info(self):
+        return self.dataset.peek("analysis_info", {})
 
     # ============================================================
     #  MAIN UI LAYOUT
@@ -87,25 +132,85 @@ class Dashboard:
         )
         footer.pack(side="bottom", pady=10)
 
+        # Status / progress area (fed by TaskRunner)
+        status_frame = tk.Frame(self.root, bg="#121212")
+        status_frame.pack(side="bottom", fill="x", padx=60)
+        self.status_label = tk.Label(status_frame, text="Ready", bg="#121212", fg="#AAAAAA",
+                                     font=("Segoe UI", 10), anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        tk.Button(status_frame, text="Cancel", command=self.runner.cancel_all, bg="#333333", fg="white",
+                  relief="flat", cursor="hand2").pack(side="right", padx=(10, 0))
+        self.progress = ttk.Progressbar(status_frame, length=260, mode="determinate", maximum=1.0)
+        self.progress.pack(side="right")
+        self.runner.add_status_listener(self.update_status)
+
+    def update_status(self, message, fraction):
+        """Show task status; fraction None means progress is unknown."""
+        self.status_label.config(text=message)
+        if fraction is None:
+            if self.progress["mode"] != "indeterminate":
+                self.progress.config(mode="indeterminate", maximum=100)
+                self.progress.start(15)
+        else:
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=1.0, value=fraction)
+
+    def _task_busy(self):
+        if self.runner.busy:
+            messagebox.showinfo("Busy", "Please wait for the current task to finish (or cancel it).")
+            return True
+        return False
+
     # ============================================================
     #  FILE UPLOAD
     # ============================================================
     def upload_file(self):
+        if self._task_busy():
+            return
         filepath = filedialog.askopenfilename(
             title="Select data file",
-            filetypes=[("Excel/CSV/JSON", "*.xlsx;*.xls;*.csv;*.json"), ("All files", "*.*")]
+            filetypes=[("Excel/CSV/JSON", "*.xlsx;*.xls;*.csv;*.json"),
+                       ("Parquet/Arrow", "*.parquet;*.pq;*.feather;*.arrow;*.ipc"), ("All files", "*.*")]
         )
         if filepath:
-            self.df = self.file_handler.load_file(filepath)
-            if self.df is not None:
-                self.is_cleaned = False
-                self.analysis_info = {}
-                messagebox.showinfo(
-                    "Success",
-                    f"Loaded: {os.path.basename(filepath)}\nRows: {len(self.df)} | Columns: {len(self.df.columns)}"
-                )
-            else:
-                messagebox.showerror("Error", "Failed to load file. Please check your input.")
+            self.runner.submit(lambda: self.file_handler.load_file(filepath), name="Load file",
+                               on_success=lambda df: self._on_file_loaded(filepath, df))
+
+    def _on_file_loaded(self, filepath, df):
+        self.dataset = DatasetContext(df, source=filepath, cache_key=self.file_handler.last_cache_key)
+        if self.df is not None:
+            message = f"Loaded: {os.path.basename(filepath)}\nRows: {len(self.df)} | Columns: {len(self.df.columns)}"
+            groups = dict(self.file_handler.last_sheet_groups)
+            if len(groups) > 1:
+                message += (f"\n\nWorkbook has {len(groups)} different sheet layouts; "
+                            f"loaded the largest. Pick another one in the window that opens.")
+            messagebox.showinfo("Success", message)
+            if len(groups) > 1:
+                self._choose_sheet_group(filepath, groups, df)
+        else:
+            messagebox.showerror("Error", "Failed to load file. Please check your input.")
+
+    def _choose_sheet_group(self, filepath, groups, current):
+        """Let the user switch to another sheet layout group of a multi-layout workbook."""
+        win = tk.Toplevel(self.root)
+        win.title("Sheet Layouts")
+        win.geometry("460x180")
+        win.configure(bg="#121212")
+
+        labels = {f"{name} ({len(g):,} rows, {len(g.columns)} columns)": name for name, g in groups.items()}
+        ttk.Label(win, text="Sheets to work with:").pack(pady=5)
+        choice = ttk.Combobox(win, values=list(labels), state="readonly", width=55)
+        choice.set(next(label for label, name in labels.items() if groups[name] is current))
+        choice.pack(pady=5)
+
+        def use_group():
+            df = groups[labels[choice.get()]]
+            if df is not self.df:
+                self.dataset = DatasetContext(df, source=filepath)
+                self.update_status(f"Using sheets {labels[choice.get()]}: {len(df):,} rows", 0)
+            win.destroy()
+
+        ttk.Button(win, text="Use Sheets", command=use_group).pack(pady=15)
 
     # ============================================================
     #  DATA CLEANING
@@ -114,9 +219,29 @@ class Dashboard:
         if self.df is None:
             messagebox.showwarning("Warning", "Please upload a file first.")
             return
-        self.df = self.data_processor.clean_data(self.df)
-        self.is_cleaned = True
-        self.analysis_info = self.data_processor.analyze_columns(self.df)
+        if self._task_busy():
+            return
+        self.runner.submit(self._clean_task, self.df, self.dataset.cache_key, name="Clean data",
+                           with_context=True, on_success=self._on_data_cleaned)
+
+    def _clean_task(self, ctx, df, cache_key):
+        ctx.progress(0.1, "Cleaning data…")
+        df = self.data_processor.clean_data(df, cache_key=cache_key, compact=True)
+        ctx.check_cancelled()
+        ctx.progress(0.7, "Analyzing columns…")
+        analysis_info = self.data_processor.analyze_columns(df)
+        ctx.check_cancelled()
+        ctx.progress(0.85, "Aggregating categories…")
+        from modules.aggregate_cube import AggregateCube
+        from modules.time_series import build_time_series
+        cube = AggregateCube().build(df, analysis_info)
+        series = build_time_series(df, analysis_info)
+        return df, analysis_info, cube, series
+
+    def _on_data_cleaned(self, result):
+        df, analysis_info, cube, series = result
+        self.dataset.replace(df, cleaned=True, analysis_info=analysis_info, aggregate_cube=cube,
+                             time_series=series)
         messagebox.showinfo("Data Cleaned", "Data cleaned successfully. You can now visualize or analyze.")
 
     # ============================================================
@@ -130,50 +255,39 @@ class Dashboard:
             messagebox.showwarning("Please clean first", "Clean data before visualization.")
             return
         from gui.visual_window import VisualizationWindow
-        VisualizationWindow(self.root, self.df)
+        VisualizationWindow(self.root, self.dataset, runner=self.runner)
 
     # ============================================================
     #  GENERATE JSON REPORT
     # ============================================================
     def generate_report(self):
-        try:
-            if self.df is None:
-                messagebox.showwarning("Warning", "Please upload a file first.")
-                return
-            if not self.is_cleaned:
-                messagebox.showwarning("Please clean first", "Clean data before generating reports.")
-                return
-
-            # ✅ Only numeric columns
-            numeric_df = self.df.select_dtypes(include="number")
-            if numeric_df.empty:
-                messagebox.showinfo("No Numeric Data", "No numeric columns found for reporting.")
-                return
-
-            # ✅ Calculate summary stats
-            summary = {}
-            for col in numeric_df.columns:
-                summary[col] = {
-                    "mean": float(numeric_df[col].mean()),
-                    "median": float(numeric_df[col].median()),
-                    "min": float(numeric_df[col].min()),
-                    "max": float(numeric_df[col].max()),
-                    "std_dev": float(numeric_df[col].std()),
-                    "missing_values": int(numeric_df[col].isna().sum())
-                }
-
-            # ✅ Save JSON report
-            os.makedirs("output", exist_ok=True)
-            report_path = os.path.join("output", "numeric_report.json")
-            with open(report_path, "w", encoding="utf-8") as f:
-                json.dump(summary, f, indent=4)
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please upload a file first.")
+            return
+        if not self.is_cleaned:
+            messagebox.showwarning("Please clean first", "Clean data before generating reports.")
+            return
+        if self._task_busy():
+            return
+        self.runner.submit(self._report_task, self.df, name="Generate report",
+                           on_success=self._on_report_done, on_error=self._on_report_failed)
 
+    def _report_task(self, df):
+        # ✅ Numeric summary stats saved as JSON
+        report_path = self.reporter.write_numeric_report(df)
+        if report_path:
             self.logger.log_info("Dashboard.generate_report", f"Report saved at {report_path}")
+        return report_path
+
+    def _on_report_done(self, report_path):
+        if report_path is None:
+            messagebox.showinfo("No Numeric Data", "No numeric columns found for reporting.")
+        else:
             messagebox.showinfo("Report Generated", f"✅ Numeric summary report saved to:\n{report_path}")
 
-        except Exception as e:
-            self.logger.log_error("Dashboard.generate_report", str(e))
-            messagebox.showerror("Error", f"Report generation failed:\n{e}")
+    def _on_report_failed(self, e):
+        self.logger.log_error("Dashboard.generate_report", str(e))
+        messagebox.showerror("Error", f"Report generation failed:\n{e}")
 
     # ============================================================
     #  COLUMN ANALYSIS DISPLAY
@@ -194,7 +308,10 @@ class Dashboard:
         self.analysis_box.tag_config("header", foreground="#00ADEF", font=("Consolas", 12, "bold"))
 
     def run(self):
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.runner.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import time
+import threading
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from modules.logger import AppLogger
+
+
+class _PooledCanvas(FigureCanvasTkAgg):
+    """Tk canvas that skips redraws while a worker thread is drawing into its figure."""
+
+    def __init__(self, figure, master, lock):
+        self._slot_lock = lock
+        super().__init__(figure, master=master)
+
+    def draw(self):
+        if not self._slot_lock.acquire(blocking=False):
+            return  # the worker calls draw_idle() once it is done
+        try:
+            super().draw()
+        finally:
+            self._slot_lock.release()
+
+
+class FigureSlot:
+    """One chart window: Toplevel + Figure + canvas, reused for successive charts."""
+
+    def __init__(self, window, figure, canvas, lock):
+        self.window = window
+        self.figure = figure
+        self.canvas = canvas
+        self.lock = lock
+        self.busy = False
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self):
+        try:
+            return bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+
+
+class FigurePool:
+    """
+    Keeps at most max_figures chart windows alive. acquire() hands out a
+    free slot, creating one while under the cap and otherwise recycling the
+    least recently used window; render() (safe off the Tk thread) clears the
+    slot's figure - reusing its axes when it has a single one - and draws
+    into it; show() redraws the existing canvas in place. Closing a window
+    releases its figure for good.
+    """
+
+    def __init__(self, master, max_figures=4, figsize=(7, 5), geometry="700x600"):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.master = master
+        self.max_figures = max_figures
+        self.figsize = figsize
+        self.geometry = geometry
+        self.slots = []
+
+    # ============================================================
+    #  Tk thread
+    # ============================================================
+    def acquire(self, title="Chart"):
+        self.slots = [s for s in self.slots if s.alive]
+        free = [s for s in self.slots if not s.busy]
+        if len(self.slots) < self.max_figures:
+            slot = self._create(title)
+        elif free:
+            slot = min(free, key=lambda s: s.last_used)
+        else:
+            raise RuntimeError(f"All {self.max_figures} chart windows are busy; try again shortly.")
+        slot.busy = True
+        slot.window.title(title)
+        return slot
+
+    def show(self, slot, title=None):
+        """Bring the slot's window up with its new drawing."""
+        slot.busy = False
+        slot.last_used = time.monotonic()
+        if not slot.alive:
+            return
+        if title:
+            slot.window.title(title)
+        slot.window.deiconify()
+        slot.window.lift()
+        slot.canvas.draw_idle()
+
+    def release(self, slot):
+        """Give a slot back without showing anything (e.g. the render failed)."""
+        slot.busy = False
+        if slot.alive and not slot.window.winfo_viewable():
+            self._close(slot)
+
+    def close_all(self):
+        for slot in list(self.slots):
+            self._close(slot)
+
+    def _create(self, title):
+        window = tk.Toplevel(self.master)
+        window.withdraw()  # shown once the first chart is drawn
+        window.title(title)
+        window.geometry(self.geometry)
+        figure = Figure(figsize=self.figsize)
+        lock = threading.Lock()
+        canvas = _PooledCanvas(figure, window, lock)
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        slot = FigureSlot(window, figure, canvas, lock)
+        window.protocol("WM_DELETE_WINDOW", lambda: self._close(slot))
+        self.slots.append(slot)
+        return slot
+
+    def _close(self, slot):
+        if slot in self.slots:
+            self.slots.remove(slot)
+        try:
+            slot.window.destroy()
+        except tk.TclError as e:
+            self.logger.log_error("FigurePool._close", str(e))
+        slot.figure.clear()
+
+    # ============================================================
+    #  Any thread
+    # ============================================================
+    def render(self, slot, draw, *args, **kwargs):
+        """Call draw(figure, ax, *args, **kwargs) on a cleared figure; returns its result."""
+        with slot.lock:
+            axes = slot.figure.get_axes()
+            if len(axes) == 1:
+                ax = axes[0]
+                ax.clear()
+            else:
+                slot.figure.clear()
+                ax = slot.figure.add_subplot()
+            return draw(slot.figure, ax, *args, **kwargs)
+
@@ -0,0 +1,154 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError
+from modules.logger import AppLogger
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when its handle has been cancelled."""
+
+
+class TaskHandle:
+    def __init__(self, name):
+        self.name = name
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+
+class TaskContext:
+    """Given to thread-mode tasks so they can report progress and honour cancel."""
+
+    def __init__(self, runner, handle):
+        self._runner = runner
+        self._handle = handle
+
+    @property
+    def cancelled(self):
+        return self._handle.cancelled
+
+    @property
+    def cancel_event(self):
+        return self._handle._cancel_event
+
+    def check_cancelled(self):
+        if self._handle.cancelled:
+            raise TaskCancelled(self._handle.name)
+
+    def progress(self, fraction, message=""):
+        self._runner._events.put(("progress", self._handle, (fraction, message)))
+
+
+class TaskRunner:
+    """
+    Runs heavy work off the Tk event thread and marshals results back with
+    root.after(). mode="thread" (default) supports progress and cooperative
+    cancellation; mode="process" runs picklable functions in a process pool.
+    """
+
+    def __init__(self, root, max_workers=2, mode="thread", poll_ms=50):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.root = root
+        self.mode = mode
+        self.poll_ms = poll_ms
+        pool = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+        self._pool = pool(max_workers=max_workers)
+        self._events = queue.Queue()
+        self._active = []
+        self._status_listeners = []
+        self.root.after(self.poll_ms, self._poll)
+
+    # ============================================================
+    #  Submit / Cancel
+    # ============================================================
+    def submit(self, func, *args, name="task", on_success=None, on_error=None,
+               on_progress=None, with_context=False, **kwargs):
+        """
+        Run func(*args, **kwargs) in the pool. With with_context=True (thread
+        mode only) func is called as func(ctx, *args, **kwargs).
+        Callbacks always run on the Tk thread.
+        """
+        handle = TaskHandle(name)
+        handle.on_success, handle.on_error, handle.on_progress = on_success, on_error, on_progress
+        if with_context and self.mode == "thread":
+            ctx = TaskContext(self, handle)
+            handle.future = self._pool.submit(func, ctx, *args, **kwargs)
+        else:
+            handle.future = self._pool.submit(func, *args, **kwargs)
+        self._active.append(handle)
+        self._notify_status(f"Running: {name}…", None)
+        handle.future.add_done_callback(lambda f: self._events.put(("done", handle, f)))
+        return handle
+
+    def cancel_all(self):
+        for handle in list(self._active):
+            handle.cancel()
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def add_status_listener(self, callback):
+        """callback(message, fraction) is called on the Tk thread; fraction None = indeterminate."""
+        self._status_listeners.append(callback)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ============================================================
+    #  Tk-side event pump
+    # ============================================================
+    def _poll(self):
+        try:
+            while True:
+                kind, handle, payload = self._events.get_nowait()
+                if kind == "progress":
+                    fraction, message = payload
+                    self._notify_status(message or f"Running: {handle.name}…", fraction)
+                    if handle.on_progress:
+                        handle.on_progress(fraction, message)
+                else:
+                    self._finish(handle, payload)
+        except queue.Empty:
+            pass
+        try:
+            self.root.after(self.poll_ms, self._poll)
+        except Exception:
+            pass  # root destroyed
+
+    def _finish(self, handle, future):
+        if handle in self._active:
+            self._active.remove(handle)
+        try:
+            result = future.result()
+        except (CancelledError, TaskCancelled):
+            self._notify_status(f"Cancelled: {handle.name}", 0)
+            return
+        except Exception as e:
+            self.logger.log_error(f"TaskRunner.{handle.name}", str(e))
+            self._notify_status(f"Failed: {handle.name}", 0)
+            if handle.on_error:
+                handle.on_error(e)
+            return
+        if handle.cancelled:
+            self._notify_status(f"Cancelled: {handle.name}", 0)
+            return
+        self._notify_status(f"Done: {handle.name}", 1)
+        if handle.on_success:
+            handle.on_success(result)
+
+    def _notify_status(self, message, fraction):
+        for callback in self._status_listeners:
+            try:
+                callback(message, fraction)
+            except Exception as e:
+                self.logger.log_error("TaskRunner.status", str(e))
@@ -1,52 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
 import pandas as pd
-import subprocess, os
+import os
 from datetime import datetime
-from modules.analytics_engine import AnalyticsEngine
+from modules.analytics_engine import AnalyticsEngine, trend_line
+from modules.chart_reduction import ChartReducer, annotate
+from modules.chart_cache import ChartCache
 from modules.logger import AppLogger
 from modules.data_processor import DataProcessor
-
-# ============================================================
-#  Function: Query local Ollama model (.gguf)
-# ============================================================
-def analyze_with_ollama(prompt, model="gemma3:4b"):
-    """
-    Runs a local Ollama model and captures plain text output safely.
-    Compatible with models that don't support --format json.
-    """
-    try:
-        print(f"🔹 Using local model: {model}")
-        result = subprocess.run(
-            ["ollama", "run", model, prompt],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-            timeout=120
-        )
-
-        response_text = result.stdout.strip()
-        if not response_text:
-            response_text = "⚠️ No response received from the local model."
-
-        return response_text
-
-    except subprocess.TimeoutExpired:
-        return "⚠️ Ollama model timed out (no response within 60 seconds)."
-    except Exception as e:
-        return f"❌ Ollama error: {e}"
-
+from modules.dataset_context import DatasetContext
+from modules.suggestion_parser import SuggestionParser
+from modules.llm_client import DEFAULT_MODEL, LLMError, LLMCancelled, SuggestionCache, default_client
+from gui.task_runner import TaskRunner
+from gui.figure_pool import FigurePool
 
 # ============================================================
 #  Visualization Window Class
 # ============================================================
 class VisualizationWindow:
-    def __init__(self, master, df):
+    def __init__(self, master, df, runner=None, llm_client=None, suggestion_cache=None):
+        """df: a cleaned DataFrame or the Dashboard's DatasetContext (reuses its column analysis)."""
         self.master = master
-        self.df = df
+        self.dataset = df if isinstance(df, DatasetContext) else DatasetContext(df)
+        self.runner = runner or TaskRunner(master)
+        self.llm_client = llm_client  # None → shared default_client()
+        self.suggestion_cache = suggestion_cache or SuggestionCache()
+        self.figure_pool = FigurePool(master)  # chart windows are recycled, at most max_figures alive
+        self.chart_cache = ChartCache()  # unchanged charts are linked into new runs, not re-rendered
         self.master.title("Visualization Engine (Local AI)")
         self.master.geometry("900x700")
         self.master.configure(bg="#121212")
@@ -71,15 +51,34 @@ class VisualizationWindow:
         self.output_text = tk.Text(master, wrap="word", height=20, bg="#1E1E1E", fg="white", font=("Consolas", 10))
         self.output_text.pack(padx=15, pady=20, fill="both", expand=True)
 
+    @property
+    def df(self):
+        return self.dataset.df
+
     # ============================================================
     #  ENGINE VISUALIZATION (local LLM via Ollama)
     # ============================================================
     def visual_by_engine(self):
         try:
-            summary = self.df.describe(include="all").to_string()
-            columns = ", ".join(self.df.columns)
+            self.output_text.delete(1.0, tk.END)
+            self.output_text.insert(tk.END, "🤖 Analyzing dataset with local AI model... please wait...\n\n")
+
+            self.runner.submit(
+                self._engine_task, self.df, DEFAULT_MODEL,
+                name="LLM suggestions", with_context=True,
+                on_success=self._show_engine_output,
+                on_error=lambda e: messagebox.showerror("Error", f"Engine visualization failed:\n{e}"),
+            )
 
-            prompt = f"""
+        except Exception as e:
+            messagebox.showerror("Error", f"Engine visualization failed:\n{e}")
+
+    def _engine_task(self, ctx, df, model):
+        """Build the prompt and answer it from the suggestion cache or the model."""
+        summary = df.describe(include="all").to_string()
+        columns = ", ".join(map(str, df.columns))
+
+        prompt = f"""
             You are a data visualization expert.
             Given this dataset with columns: {columns}
             and the following summary:
@@ -90,16 +89,49 @@ class VisualizationWindow:
             <chart_type> | <x_column> | <y_column or None> | <reason>
             """
 
-            self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(tk.END, "🤖 Analyzing dataset with local AI model... please wait...\n\n")
-
-            output = analyze_with_ollama(prompt, model="gemma3:4b")
-
-            self.output_text.insert(tk.END, output)
-            print("\n=== AI Visualization Suggestions ===\n", output)
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Engine visualization failed:\n{e}")
+        key = self.suggestion_cache.key(df, summary, model)
+        output = self.suggestion_cache.get(key)
+        cached = output is not None
+        if not cached:
+            ctx.check_cancelled()
+            ctx.progress(None, "Waiting for the local model…")
+            try:
+                output = (self.llm_client or default_client()).generate(prompt, model=model,
+                                                                         cancel_event=ctx.cancel_event)
+            except LLMCancelled:
+                return {"text": "⚠️ Ollama request cancelled."}
+            except LLMError as e:
+                return {"text": f"⚠️ {e}"}
+            self.suggestion_cache.put(key, output, model=model)
+
+        # Turn the suggestions into chart specs and render them like the analytical engine
+        ctx.check_cancelled()
+        ctx.progress(0.6, "Rendering suggested charts…")
+        analysis_info = self.dataset.analysis_info(DataProcessor())
+        parser = SuggestionParser(analysis_info)
+        specs = parser.parse(output)
+        charts = []
+        if specs:
+            output_dir = os.path.join("output", f"llm_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            analytics = AnalyticsEngine(chart_cache=self.chart_cache)
+            charts = analytics.generate_and_save_charts(df, analysis_info, output_dir=output_dir, specs=specs,
+                                                        cube=self.dataset.peek("aggregate_cube"),
+                                                        series=self.dataset.peek("time_series"))
+        return {"text": output, "cached": cached, "specs": specs, "rejected": parser.rejected, "charts": charts}
+
+    def _show_engine_output(self, result):
+        output = result["text"]
+        if result.get("cached"):
+            self.output_text.insert(tk.END, "(cached suggestions)\n")
+        self.output_text.insert(tk.END, output + "\n")
+        print("\n=== AI Visualization Suggestions ===\n", output)
+        if "specs" not in result:
+            return
+        self.output_text.insert(tk.END, f"\n=== {len(result['specs'])} suggestion(s) rendered ===\n")
+        for path in result["charts"]:
+            self.output_text.insert(tk.END, f"✅ Saved: {path}\n")
+        for line, why in result["rejected"]:
+            self.output_text.insert(tk.END, f"⏭ Skipped: {line}  ({why})\n")
 
     # ============================================================
     #  USER VISUALIZATION (manual)
@@ -123,70 +155,95 @@ class VisualizationWindow:
         plot_type.pack(pady=5)
 
         def create_plot():
+            x = x_col.get()
+            y = y_col.get()
+            plot = plot_type.get()
+
+            if not x or not plot:
+                messagebox.showwarning("Missing Input", "Please select at least X column and Plot Type.")
+                return
+            if plot == "pie" and not y:
+                messagebox.showwarning("Invalid", "Pie chart requires both X and Y columns.")
+                return
+
             try:
-                x = x_col.get()
-                y = y_col.get()
-                plot = plot_type.get()
-
-                if not x or not plot:
-                    messagebox.showwarning("Missing Input", "Please select at least X column and Plot Type.")
-                    return
-
-                fig, ax = plt.subplots(figsize=(7, 5))
-                if plot == "line":
-                    self.df.plot(x=x, y=y, kind="line", ax=ax)
-                elif plot == "bar":
-                    self.df.plot(x=x, y=y, kind="bar", ax=ax)
-                elif plot == "scatter":
-                    self.df.plot(x=x, y=y, kind="scatter", ax=ax)
-                elif plot == "pie":
-                    if y:
-                        data = self.df.groupby(x)[y].sum()
-                        data.plot(kind="pie", ax=ax, autopct="%1.1f%%")
-                    else:
-                        messagebox.showwarning("Invalid", "Pie chart requires both X and Y columns.")
-                        return
-                elif plot == "hist":
-                    self.df[x].plot(kind="hist", ax=ax, bins=20)
-
-                ax.set_title(f"{plot.title()} Chart of {x} vs {y if y else ''}")
-                plt.tight_layout()
-
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"output/chart_{plot}_{timestamp}.png"
-                fig.savefig(filename)
-                print(f"✅ Chart saved: {filename}")
-
-                chart_win = tk.Toplevel(win)
-                chart_win.title("Chart")
-                chart_win.geometry("700x600")
-
-                canvas = FigureCanvasTkAgg(fig, master=chart_win)
-                canvas.get_tk_widget().pack(fill="both", expand=True)
-                canvas.draw()
-
-                messagebox.showinfo("Saved", f"Chart saved successfully to:\n{filename}")
-
-            except Exception as e:
-                messagebox.showerror("Error", f"Plot failed:\n{e}")
+                slot = self.figure_pool.acquire(title=f"{plot.title()} Chart")
+            except RuntimeError as e:
+                messagebox.showwarning("Busy", str(e))
+                return
+            self.runner.submit(self.figure_pool.render, slot, self._draw_user_plot, self.df, x, y, plot,
+                               cube=self.dataset.peek("aggregate_cube"), series=self.dataset.peek("time_series"),
+                               name="Create plot",
+                               on_success=lambda filename: show_plot(slot, filename),
+                               on_error=lambda e: plot_failed(slot, e))
+
+        def show_plot(slot, filename):
+            self.figure_pool.show(slot)
+            messagebox.showinfo("Saved", f"Chart saved successfully to:\n{filename}")
+
+        def plot_failed(slot, e):
+            self.figure_pool.release(slot)
+            messagebox.showerror("Error", f"Plot failed:\n{e}")
 
         ttk.Button(win, text="Create Plot", command=create_plot).pack(pady=15)
 
+    def _draw_user_plot(self, fig, ax, df, x, y, plot, cube=None, series=None):
+        """
+        Draw the user's chart onto fig/ax (a pooled figure off the Tk thread)
+        and save it; returns the filename. Pie sums come from cube and time
+        lines from series (TimeSeriesIndex per datetime column) when they have them.
+        """
+        index = (series or {}).get(x)
+        if plot == "line" and index is not None and y in index.numeric:
+            annotate(fig, trend_line(ax, index, y, ChartReducer(), df=df))
+        elif plot == "line":
+            df.plot(x=x, y=y, kind="line", ax=ax)
+        elif plot == "bar":
+            df.plot(x=x, y=y, kind="bar", ax=ax)
+        elif plot == "scatter":
+            df.plot(x=x, y=y, kind="scatter", ax=ax)
+        elif plot == "pie":
+            data = cube.sums(x, y) if cube is not None else None
+            if data is None:
+                data = df.groupby(x)[y].sum()
+            else:
+                data = data.sort_index()
+            data.plot(kind="pie", ax=ax, autopct="%1.1f%%")
+        elif plot == "hist":
+            df[x].plot(kind="hist", ax=ax, bins=20)
+
+        ax.set_title(f"{plot.title()} Chart of {x} vs {y if y else ''}")
+        fig.tight_layout()
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"output/chart_{plot}_{timestamp}.png"
+        fig.savefig(filename)
+        print(f"✅ Chart saved: {filename}")
+        return filename
+
     # ============================================================
     #  ANALYTICAL ENGINE VISUALIZATION (auto generate & log)
     # ============================================================
     def visual_by_analytical(self):
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, "🧠 Analytical Engine — Generating Visualizations...\n\n")
+        self.runner.submit(self._analytical_task, self.df, name="Analytical charts", with_context=True,
+                           on_success=self._show_analytical_output, on_error=self._analytical_failed)
+
+    def _analytical_task(self, ctx, df):
+        analytics = AnalyticsEngine(chart_cache=self.chart_cache)
+
+        ctx.progress(0.1, "Analyzing columns…")
+        analysis_info = self.dataset.analysis_info(DataProcessor())
+        ctx.check_cancelled()
+        ctx.progress(0.3, "Rendering charts…")
+        return analytics.generate_and_save_charts(
+            df, analysis_info, workers=min(4, os.cpu_count() or 1), cube=self.dataset.peek("aggregate_cube"),
+            series=self.dataset.peek("time_series"))
+
+    def _show_analytical_output(self, generated_files):
+        logger = AppLogger("logs/error_log.txt")
         try:
-            logger = AppLogger("logs/error_log.txt")
-            analytics = AnalyticsEngine()
-            processor = DataProcessor()
-
-            self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(tk.END, "🧠 Analytical Engine — Generating Visualizations...\n\n")
-
-            analysis_info = processor.analyze_columns(self.df)
-            generated_files = analytics.generate_and_save_charts(self.df, analysis_info)
-
             log_text = "=== Analytical Engine Suggestions ===\n"
             if generated_files:
                 for path in generated_files:
@@ -204,8 +261,11 @@ class VisualizationWindow:
             logger.log_info("visual_by_analytical", f"{len(generated_files)} charts logged successfully.")
 
         except Exception as e:
-            messagebox.showerror("Error", f"Analytical engine failed:\n{e}")
-            logger.log_error("visual_by_analytical", str(e))
+            self._analytical_failed(e)
+
+    def _analytical_failed(self, e):
+        messagebox.showerror("Error", f"Analytical engine failed:\n{e}")
+        AppLogger("logs/error_log.txt").log_error("visual_by_analytical", str(e))
 
 
 # ============================================================
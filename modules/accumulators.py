@@ -0,0 +1,183 @@
+import math
+import pandas as pd
+from modules.sketches import QuantileSketch, DistinctSketch, TopKSketch
+
+
+# ============================================================
+#  Mergeable running statistics (used for chunked data)
+# ============================================================
+class NumericAccumulator:
+    """
+    Running count/mean/std/min/max (Welford moments, exact when merged) plus
+    a KLL sketch for quartiles, updated per chunk and mergeable.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = QuantileSketch()
+
+    def update(self, series):
+        values = pd.to_numeric(series, errors="coerce").dropna()
+        if values.empty:
+            return self
+        self.quantiles.update(values)
+        other = NumericAccumulator()
+        other.count = int(len(values))
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        return self.merge(other)
+
+    def merge(self, other):
+        """Combine with another accumulator (Chan et al. parallel variance)."""
+        if other.count == 0:
+            return self
+        if other.quantiles is not self.quantiles and other.quantiles.n:
+            self.quantiles.merge(other.quantiles)
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+    def summary(self):
+        q1, median, q3 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        return {"count": self.count, "mean": self.mean, "std": self.std,
+                "min": self.min, "25%": q1, "50%": median, "75%": q3, "max": self.max}
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min, "max": self.max, "quantiles": self.quantiles.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls()
+        acc.count, acc.mean, acc.m2 = data["count"], data["mean"], data["m2"]
+        acc.min, acc.max = data["min"], data["max"]
+        if "quantiles" in data:
+            acc.quantiles = QuantileSketch.from_dict(data["quantiles"])
+        return acc
+
+
+class CategoryAccumulator:
+    """
+    Bounded-memory summary of a non-numeric column: HyperLogLog for the
+    number of distinct values and a Misra–Gries sketch for the top values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.distinct = DistinctSketch()
+        self.top_values = TopKSketch()
+
+    def update(self, series):
+        values = series.dropna().astype(str)
+        self.count += int(len(values))
+        self.distinct.update(values)
+        self.top_values.update(values)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        return self
+
+    @property
+    def unique(self):
+        return self.distinct.count()
+
+    def summary(self):
+        top, freq = (self.top_values.top(1) or [(None, 0)])[0]
+        return {"count": self.count, "unique": self.unique, "top": top, "freq": int(freq)}
+
+    def to_dict(self):
+        return {"count": self.count, "distinct": self.distinct.to_dict(),
+                "top_values": self.top_values.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls()
+        acc.count = data["count"]
+        acc.distinct = DistinctSketch.from_dict(data["distinct"])
+        acc.top_values = TopKSketch.from_dict(data["top_values"])
+        return acc
+
+
+class FrameAccumulator:
+    """Per-column accumulators for a stream of DataFrame chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = []
+        self.missing = {}
+        self.stats = {}
+
+    def update(self, df):
+        self.rows += int(len(df))
+        missing = df.isna().sum()
+        for col in df.columns:
+            if col not in self.stats:
+                self.columns.append(col)
+                self.missing[col] = 0
+                numeric = pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+                self.stats[col] = NumericAccumulator() if numeric else CategoryAccumulator()
+            self.missing[col] += int(missing[col])
+            self.stats[col].update(df[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col in other.columns:
+            if col not in self.stats:
+                self.columns.append(col)
+                self.missing[col] = 0
+                self.stats[col] = type(other.stats[col])()
+            self.missing[col] += other.missing[col]
+            self.stats[col].merge(other.stats[col])
+        return self
+
+    def summary(self):
+        """Return a dict shaped like AnalyticsEngine.summarize's output."""
+        return {
+            "rows": self.rows,
+            "columns": len(self.columns),
+            "missing_values": dict(self.missing),
+            "numeric_summary": {col: self.stats[col].summary() for col in self.columns},
+        }
+
+    def to_dict(self):
+        return {
+            "rows": self.rows,
+            "columns": list(self.columns),
+            "missing": dict(self.missing),
+            "stats": {col: {"kind": "numeric" if isinstance(acc, NumericAccumulator) else "categorical",
+                            **acc.to_dict()} for col, acc in self.stats.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls()
+        acc.rows = data["rows"]
+        acc.columns = list(data["columns"])
+        acc.missing = dict(data["missing"])
+        for col, state in data["stats"].items():
+            kind = NumericAccumulator if state["kind"] == "numeric" else CategoryAccumulator
+            acc.stats[col] = kind.from_dict(state)
+        return acc
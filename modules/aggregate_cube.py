@@ -0,0 +1,167 @@
+import pandas as pd
+from modules.logger import AppLogger
+from modules.instrumentation import span
+
+QUANTILES = (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0)
+
+
+class AggregateCube:
+    """
+    Pre-aggregated categorical × numeric statistics, built once per cleaned
+    frame so category charts (bar, bar_top, pie, box_group) read a few
+    hundred numbers instead of rescanning every row.
+
+    For each categorical column: category counts (value_counts order, kept
+    to max_categories entries). For each categorical × numeric pair:
+    count/sum/min/max per category, plus a quantile grid (QUANTILES) and the
+    whisker ends (the most extreme values inside the 1.5 IQR fences, as
+    matplotlib's boxplot computes them) for the quantile_categories most
+    frequent categories, which is what box plots draw. Columns with more than max_categories distinct values (per
+    analysis_info, when given) are left out; callers fall back to the raw
+    frame for those.
+    build(..., time_column=, freq=) also keeps per-period counts and sums.
+    """
+
+    def __init__(self, max_categories=10_000, quantile_categories=20):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.max_categories = max_categories
+        self.quantile_categories = quantile_categories
+        self.rows = 0
+        self.category_counts = {}   # cat -> Series (count, descending)
+        self.truncated = set()      # cats whose counts were cut to max_categories
+        self.pairs = {}             # (cat, num) -> DataFrame[count, sum, min, max]
+        self.quantiles = {}         # (cat, num) -> DataFrame (category x QUANTILES)
+        self.whiskers = {}          # (cat, num) -> DataFrame (category x [low, high])
+        self.timeline = {}          # cat -> DataFrame indexed (period, category): count + numeric sums
+        self.freq = None
+
+    def build(self, df, analysis_info=None, time_column=None, freq=None):
+        """Aggregate df; analysis_info (DataProcessor.analyze_columns) picks the column kinds."""
+        try:
+            with span("cube", rows=len(df)):
+                categorical, numeric = self._columns(df, analysis_info)
+                self.rows = int(len(df))
+                for cat in categorical:
+                    unique = (analysis_info or {}).get(cat, {}).get("unique")
+                    if unique is not None and unique > self.max_categories:
+                        continue  # e.g. IDs: value_counts alone would cost more than the charts save
+                    self._build_column(df, cat, numeric)
+                if time_column is not None and freq:
+                    self._build_timeline(df, time_column, freq, categorical, numeric)
+            self.logger.log_info("AggregateCube.build",
+                                 f"{len(self.category_counts)} categorical columns, {len(self.pairs)} pairs.")
+        except Exception as e:
+            self.logger.log_error("AggregateCube.build", str(e))
+        return self
+
+    def _columns(self, df, analysis_info):
+        if analysis_info:
+            categorical = [c for c, i in analysis_info.items() if i["kind"] == "categorical" and c in df.columns]
+            numeric = [c for c, i in analysis_info.items() if i["kind"] == "numeric" and c in df.columns
+                       and not pd.api.types.is_bool_dtype(df[c])]
+        else:
+            numeric = [c for c in df.select_dtypes(include="number").columns if not pd.api.types.is_bool_dtype(df[c])]
+            categorical = [c for c in df.columns if c not in numeric
+                           and not pd.api.types.is_datetime64_any_dtype(df[c])]
+        return categorical, numeric
+
+    def _build_column(self, df, cat, numeric):
+        counts = df[cat].value_counts()
+        if len(counts) > self.max_categories:
+            self.category_counts[cat] = counts.iloc[:self.max_categories]
+            self.truncated.add(cat)
+            return
+        self.category_counts[cat] = counts
+        if not numeric or counts.empty:
+            return
+        grouped = df.groupby(cat, observed=True, sort=False)[numeric]
+        stats = grouped.agg(["count", "sum", "min", "max"])
+        top = counts.index[:self.quantile_categories]
+        sub = df.loc[df[cat].isin(top), [cat] + numeric]
+        grid = sub.groupby(cat, observed=True, sort=False)[numeric].quantile(list(QUANTILES))
+        for num in numeric:
+            self.pairs[(cat, num)] = stats[num]
+            self.quantiles[(cat, num)] = grid[num].unstack()
+            self.whiskers[(cat, num)] = self._whiskers(sub[cat], sub[num], self.quantiles[(cat, num)])
+
+    @staticmethod
+    def _whiskers(labels, values, grid):
+        """Per category: lowest and highest value within [q1 - 1.5 IQR, q3 + 1.5 IQR]."""
+        q1 = labels.map(grid[0.25]).astype(float)
+        q3 = labels.map(grid[0.75]).astype(float)
+        reach = 1.5 * (q3 - q1)
+        values = pd.to_numeric(values, errors="coerce")
+        inside = values[(values >= q1 - reach) & (values <= q3 + reach)]
+        grouped = inside.groupby(labels[inside.index], observed=True, sort=False)
+        return pd.DataFrame({"low": grouped.min(), "high": grouped.max()})
+
+    def _build_timeline(self, df, time_column, freq, categorical, numeric):
+        periods = pd.to_datetime(df[time_column], errors="coerce").dt.to_period(freq).rename("period")
+        self.freq = freq
+        for cat in categorical:
+            if cat not in self.category_counts or cat in self.truncated:
+                continue
+            top = self.category_counts[cat].index[:self.quantile_categories]
+            mask = df[cat].isin(top)
+            frame = df.loc[mask, [cat] + numeric]
+            grouped = frame.groupby([periods[mask], cat], observed=True)
+            self.timeline[cat] = grouped[numeric].sum().assign(count=grouped.size())
+
+    # ============================================================
+    #  Queries
+    # ============================================================
+    def has(self, cat, num=None):
+        if num is None:
+            return cat in self.category_counts
+        return (cat, num) in self.pairs
+
+    def counts(self, cat, top=None):
+        """value_counts() of cat (descending), or None if not in the cube."""
+        counts = self.category_counts.get(cat)
+        if counts is None or (top is None and cat in self.truncated):
+            return None
+        return counts if top is None else counts.iloc[:top]
+
+    def sums(self, cat, num, top=None):
+        """df.groupby(cat)[num].sum(), largest first, or None if not in the cube."""
+        stats = self.pairs.get((cat, num))
+        if stats is None:
+            return None
+        sums = stats["sum"].sort_values(ascending=False, kind="mergesort")
+        return sums if top is None else sums.iloc[:top]
+
+    def stats(self, cat, num):
+        """Per-category count, sum, min, max and mean of num."""
+        stats = self.pairs.get((cat, num))
+        if stats is None:
+            return None
+        return stats.assign(mean=stats["sum"] / stats["count"].where(stats["count"] > 0))
+
+    def box_stats(self, cat, num, top=10):
+        """
+        Box-plot statistics for the top most frequent categories, in ax.bxp()
+        format. Median, quartiles and whiskers match ax.boxplot() on the raw
+        rows; outliers beyond the whiskers are not kept, so fliers is empty.
+        """
+        grid = self.quantiles.get((cat, num))
+        whiskers = self.whiskers.get((cat, num))
+        if grid is None or whiskers is None or top > self.quantile_categories:
+            return None
+        boxes = []
+        for label in self.category_counts[cat].index[:top]:
+            if label not in grid.index:
+                continue
+            q = grid.loc[label]
+            if q.isna().all():
+                continue
+            low, high = whiskers.loc[label] if label in whiskers.index else (q[0.25], q[0.75])
+            boxes.append({"label": str(label), "med": q[0.5], "q1": q[0.25], "q3": q[0.75],
+                          "whislo": low, "whishi": high, "fliers": []})
+        return boxes
+
+    def over_time(self, cat, num=None):
+        """Periods × categories table of counts (or sums of num), when built with a time bucket."""
+        frame = self.timeline.get(cat)
+        if frame is None:
+            return None
+        return frame[num if num is not None else "count"].unstack(fill_value=0)
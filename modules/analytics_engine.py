@@ -1,20 +1,47 @@
 import os
 import time
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 from modules.logger import AppLogger
+from modules.accumulators import FrameAccumulator
+from modules.chart_reduction import ChartReducer, DEFAULT_MAX_POINTS, annotate, png_metadata
+from modules.instrumentation import span, traced
+from modules.process_pool import pool_context
+
+CHART_FIGSIZE = (6, 4)
+# Measured (benchmarks/bench_pipeline.py --render-workers): starting a forkserver pool costs ~1.5 s,
+# while a chart drawn from raw rows costs ~0.1 s + ~1 µs per row, so only large raw-row workloads gain.
+PARALLEL_RENDER_MIN_JOBS = 8        # charts that read raw rows
+PARALLEL_RENDER_MIN_ROWS = 1_000_000
 
 
 class AnalyticsEngine:
-    def __init__(self):
+    def __init__(self, max_points=DEFAULT_MAX_POINTS, scatter_budget=5, chart_cache=None):
         self.logger = AppLogger("logs/error_log.txt")
+        self.reducer = ChartReducer(max_points=max_points)  # charts above max_points are reduced
+        self.scatter_budget = scatter_budget  # most scatter charts suggest_charts proposes
+        self.chart_cache = chart_cache  # ChartCache: identical charts are linked, not re-rendered
+        self.last_chart_meta = []  # per saved chart: path, spec and data reduction applied
+        self.last_pair_scores = []  # suggest_charts: every numeric pair with r / NMI / score
 
     # ============================================================
     # 1️⃣ Summarize Dataset (for reporting)
     # ============================================================
-    def summarize(self, df):
-        """Return dataset summary with row/column count and stats."""
+    def summarize(self, df, sketch=False, workers=None, block_rows=1_000_000):
+        """
+        Return dataset summary with row/column count and stats.
+        Also accepts an iterator of DataFrame chunks (FileHandler.iter_chunks),
+        in which case stats are accumulated one chunk at a time with mergeable
+        sketches (exact moments, approximate quartiles/unique/top).
+        sketch=True does the same one-pass summary on an in-memory frame,
+        split into row blocks that `workers` threads summarise in parallel.
+        """
         try:
+            if not isinstance(df, pd.DataFrame):
+                return self._summarize_chunks(df)
+            if sketch:
+                return self._summarize_blocks(df, workers, block_rows)
             summary = {
                 "rows": int(len(df)),
                 "columns": int(len(df.columns)),
@@ -27,11 +54,39 @@ class AnalyticsEngine:
             self.logger.log_error("AnalyticsEngine.summarize", str(e))
             return {}
 
+    def _summarize_chunks(self, chunks):
+        acc = FrameAccumulator()
+        for chunk in chunks:
+            acc.update(chunk)
+        summary = acc.summary()
+        self.logger.log_info("AnalyticsEngine.summarize", f"Streaming summary generated for {acc.rows} rows.")
+        return summary
+
+    def _summarize_blocks(self, df, workers, block_rows):
+        blocks = [df.iloc[i:i + block_rows] for i in range(0, max(len(df), 1), block_rows)]
+        if workers and workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(lambda b: FrameAccumulator().update(b), blocks))
+        else:
+            partials = [FrameAccumulator().update(b) for b in blocks]
+        acc = partials[0]
+        for part in partials[1:]:
+            acc.merge(part)
+        self.logger.log_info("AnalyticsEngine.summarize", f"Sketch summary generated for {acc.rows} rows.")
+        return acc.summary()
+
     # ============================================================
     # 2️⃣ Suggest Suitable Chart Types
     # ============================================================
-    def suggest_charts(self, analysis_info, minimum=6):
-        """Suggest visualization specs based on column types."""
+    @traced("suggest", rows=lambda specs, *args, **kwargs: len(specs))
+    def suggest_charts(self, analysis_info, minimum=6, df=None, max_scatter=None):
+        """
+        Suggest visualization specs based on column types.
+        With df, numeric pairs are ranked by score_numeric_pairs (correlation
+        and mutual information) and only the best max_scatter (default
+        self.scatter_budget) become scatter charts; without it the first
+        pairs in column order are used.
+        """
         try:
             specs = []
             cols = list(analysis_info.keys())
@@ -49,13 +104,21 @@ class AnalyticsEngine:
                 elif info["kind"] == "datetime":
                     specs.append({"type": "line", "cols": [col], "reason": "Time trend"})
 
-            # numeric correlations (scatter)
+            # numeric correlations (scatter), best pairs first
             numeric = [c for c, i in analysis_info.items() if i["kind"] == "numeric"]
-            for i in range(len(numeric)):
-                for j in range(i + 1, len(numeric)):
-                    specs.append({"type": "scatter", "cols": [numeric[i], numeric[j]], "reason": "Correlation"})
-                    if len(specs) > minimum:
-                        break
+            budget = self.scatter_budget if max_scatter is None else max_scatter
+            self.last_pair_scores = []
+            if df is not None and len(numeric) > 1:
+                with span("suggest.pairs", rows=len(df), columns=len(numeric)):
+                    self.last_pair_scores = score_numeric_pairs(df, [c for c in numeric if c in df.columns])
+                for pair in self.last_pair_scores[:budget]:
+                    specs.append({"type": "scatter", "cols": [pair["x"], pair["y"]],
+                                  "reason": f"Correlation r={pair['r']:+.2f}, NMI={pair['nmi']:.2f}, "
+                                            f"score={pair['score']:.2f}"})
+            else:
+                pairs = [(a, b) for i, a in enumerate(numeric) for b in numeric[i + 1:]]
+                for a, b in pairs[:budget]:
+                    specs.append({"type": "scatter", "cols": [a, b], "reason": "Correlation"})
 
             # ensure minimum
             while len(specs) < minimum and numeric:
@@ -76,47 +139,76 @@ class AnalyticsEngine:
     # ============================================================
     # 3️⃣ Generate & Save Charts
     # ============================================================
-    def generate_and_save_charts(self, df, analysis_info):
-        """Generate visualizations from suggestions and save images."""
+    def generate_and_save_charts(self, df, analysis_info, workers=None, output_dir=None, specs=None, cube=None,
+                                 series=None):
+        """
+        Generate visualizations from suggestions and save images.
+        Charts answered from aggregates (cube, series rollups, prebinned
+        histograms) are always drawn here. workers > 1 sends the rest to a
+        process pool (Agg backend) when there are at least
+        PARALLEL_RENDER_MIN_JOBS of them over PARALLEL_RENDER_MIN_ROWS rows and
+        more than one CPU; each worker receives only their columns, once.
+        Results keep suggestion order.
+        output_dir defaults to output/analytical_<timestamp>; specs overrides
+        suggest_charts(analysis_info). cube (an AggregateCube of df) answers
+        bar/pie/box_group charts without rescanning df; series (from
+        time_series.build_time_series) serves sorted, rolled-up line charts.
+        With self.chart_cache, charts whose spec, input data and style match
+        a cached render are linked from the cache, and the run's files are
+        listed in <output_dir>/chart_manifest.json.
+        """
         try:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            output_dir = os.path.join("output", f"analytical_{timestamp}")
+            output_dir = output_dir or os.path.join("output", f"analytical_{timestamp}")
             os.makedirs(output_dir, exist_ok=True)
 
-            suggestions = self.suggest_charts(analysis_info)
-            saved_paths = []
+            suggestions = specs if specs is not None else self.suggest_charts(analysis_info, df=df)
+            jobs = [(i, s, os.path.join(output_dir, chart_filename(s)), self.reducer)
+                    for i, s in enumerate(suggestions)]
 
-            for s in suggestions:
-                chart_type = s["type"]
-                cols = s["cols"]
-                try:
-                    fig, ax = plt.subplots(figsize=(6, 4))
-
-                    if chart_type == "hist":
-                        df[cols[0]].plot(kind="hist", ax=ax, bins=20)
-                    elif chart_type == "box":
-                        df[cols[0]].plot(kind="box", ax=ax)
-                    elif chart_type in ["bar", "bar_top"]:
-                        df[cols[0]].value_counts().head(10).plot(kind="bar", ax=ax)
-                    elif chart_type == "scatter" and len(cols) == 2:
-                        df.plot(kind="scatter", x=cols[0], y=cols[1], ax=ax)
-                    elif chart_type == "line" and len(cols) == 1:
-                        num_cols = df.select_dtypes(include="number").columns
-                        if len(num_cols) > 0:
-                            df.plot(x=cols[0], y=num_cols[0], kind="line", ax=ax)
-
-                    ax.set_title(f"{chart_type.title()} — {', '.join(cols)}")
-                    plt.tight_layout()
-
-                    save_path = os.path.join(output_dir, f"{chart_type}_{'_'.join(cols)}.png")
-                    plt.savefig(save_path)
-                    plt.close(fig)
-
-                    saved_paths.append(save_path)
-                    self.logger.log_info("Chart Saved", save_path)
+            keys, results = {}, {}
+            if self.chart_cache is not None:
+                keys = self._chart_keys(df, jobs, cube, series)
+                for i, _, path, _ in jobs:
+                    record = self.chart_cache.fetch(keys[i], path)
+                    if record is not None:
+                        results[i] = (path, None, record.get("meta"))
+            pending = [job for job in jobs if job[0] not in results]
 
-                except Exception as e:
-                    self.logger.log_error("AnalyticsEngine.generate_chart", f"{chart_type} | {cols} | {e}")
+            rendered = {}
+            raw = [job for job in pending if _reads_rows(job[1], cube, series)]
+            workers = min(workers or 1, os.cpu_count() or 1)
+            if workers > 1 and len(raw) >= PARALLEL_RENDER_MIN_JOBS and len(df) >= PARALLEL_RENDER_MIN_ROWS:
+                # raw-row charts use neither cube nor series, so workers get only df's columns
+                rendered = dict(zip((job[0] for job in raw), self._render_parallel(df, raw, workers)))
+            for job in pending:
+                if job[0] not in rendered:
+                    rendered[job[0]] = _render_job(df, *job, cube=cube, series=series)
+            rendered_ids = {job[0] for job in pending}
+            for i, spec, _, _ in pending:
+                result = rendered[i]
+                results[i] = result
+                if keys and not result[1]:
+                    self.chart_cache.put(keys[i], result[0], spec=spec, meta=result[2])
+
+            saved_paths = []
+            self.last_chart_meta = []
+            manifest = []
+            for i, spec, _, _ in jobs:
+                path, error, meta = results[i]
+                if error:
+                    self.logger.log_error("AnalyticsEngine.generate_chart", f"{spec['type']} | {spec['cols']} | {error}")
+                else:
+                    saved_paths.append(path)
+                    self.last_chart_meta.append({"path": path, "spec": spec, "reduction": meta})
+                    self.logger.log_info("Chart Saved", path)
+                    if keys:
+                        manifest.append({"file": os.path.basename(path), "spec": spec, "key": keys[i],
+                                         "cached": i not in rendered_ids})
+            if keys:
+                self.chart_cache.write_manifest(output_dir, manifest)
+                self.logger.log_info("AnalyticsEngine.generate_and_save_charts",
+                                     f"{len(jobs) - len(pending)} cached, {len(pending)} rendered.")
 
             # ✅ Log saved charts to engine_suggestions.txt
             with open("logs/engine_suggestions.txt", "a", encoding="utf-8") as logf:
@@ -129,3 +221,271 @@ class AnalyticsEngine:
         except Exception as e:
             self.logger.log_error("AnalyticsEngine.generate_and_save_charts", str(e))
             return []
+
+    def _chart_keys(self, df, jobs, cube=None, series=None):
+        """ChartCache key per job index; each input column is hashed once."""
+        from importlib.metadata import version
+        style = {
+            "figsize": CHART_FIGSIZE,
+            "reducer": vars(self.reducer),
+            "matplotlib": version("matplotlib"),
+            "cube": cube is not None,
+            "series": sorted(map(str, series)) if series else [],
+        }
+        fingerprints, keys = {}, {}
+        for i, spec, _, _ in jobs:
+            cols = chart_columns(df, spec)
+            for c in cols:
+                if c not in fingerprints:
+                    fingerprints[c] = self.chart_cache.column_fingerprint(df[c])
+            keys[i] = self.chart_cache.key(spec, {str(c): fingerprints[c] for c in cols}, style)
+        return keys
+
+    def _render_parallel(self, df, jobs, workers, cube=None, series=None):
+        """Render jobs in a process pool; returns results in job order."""
+        needed = {c for _, s, _, _ in jobs for c in chart_columns(df, s)}
+        needed = [c for c in df.columns if c in needed]  # df's order: one-column lines take the first numeric
+        results = [None] * len(jobs)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(), initializer=_init_render_worker,
+                                 initargs=(df[needed], cube, series)) as pool:
+            futures = {pool.submit(_render_worker_job, *job): n for n, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = (None, str(e), None)
+        return results
+
+
+# ============================================================
+#  Numeric pair ranking (scatter suggestions)
+# ============================================================
+def score_numeric_pairs(df, columns, sample_rows=50_000, bins=10, block_rows=10_000, seed=0):
+    """
+    Score every pair of numeric columns in one pass, on at most sample_rows
+    sampled rows. r is the Pearson correlation. nmi is mutual information
+    over bins equal-frequency bins, normalised by the smaller entropy: it
+    catches non-linear relationships r misses. Every pair's contingency
+    table comes from one one-hot matrix product, accumulated over row
+    blocks. Missing values are dropped pairwise. Returns
+    [{x, y, r, nmi, score}] best first, where score = (|r| + nmi) / 2.
+    """
+    columns = list(columns)
+    k = len(columns)
+    if k < 2:
+        return []
+    data = df[columns]
+    if len(data) > sample_rows:
+        data = data.sample(n=sample_rows, random_state=seed)
+    data = data.apply(pd.to_numeric, errors="coerce").astype(float)
+    corr = data.corr().to_numpy()
+
+    ranks = data.rank(pct=True).to_numpy()
+    codes = np.where(np.isnan(ranks), -1, np.minimum(np.ceil(ranks * bins) - 1, bins - 1)).astype(np.int64)
+    slots = codes + np.arange(k) * bins
+    joint = np.zeros((k * bins, k * bins))
+    for start in range(0, len(codes), block_rows):
+        block = slots[start:start + block_rows]
+        onehot = np.zeros((len(block), k * bins), dtype=np.float32)
+        rows, cols = np.nonzero(codes[start:start + block_rows] >= 0)
+        onehot[rows, block[rows, cols]] = 1.0
+        joint += onehot.T @ onehot
+
+    scores = []
+    for i in range(k):
+        for j in range(i + 1, k):
+            table = joint[i * bins:(i + 1) * bins, j * bins:(j + 1) * bins]
+            r = 0.0 if np.isnan(corr[i, j]) else float(corr[i, j])
+            nmi = _normalized_mutual_information(table)
+            scores.append({"x": columns[i], "y": columns[j], "r": round(r, 4), "nmi": round(nmi, 4),
+                           "score": round((abs(r) + nmi) / 2, 4)})
+    scores.sort(key=lambda s: s["score"], reverse=True)
+    return scores
+
+
+def _normalized_mutual_information(table):
+    total = table.sum()
+    if total <= 0:
+        return 0.0
+    p = table / total
+    px, py = p.sum(axis=1), p.sum(axis=0)
+    nz = p > 0
+    mi = float((p[nz] * np.log(p[nz] / np.outer(px, py)[nz])).sum())
+    hx = float(-(px[px > 0] * np.log(px[px > 0])).sum())
+    hy = float(-(py[py > 0] * np.log(py[py > 0])).sum())
+    if min(hx, hy) <= 0:
+        return 0.0
+    return max(0.0, min(1.0, mi / min(hx, hy)))
+
+
+# ============================================================
+#  Chart rendering (shared by serial and process-pool paths)
+# ============================================================
+def chart_filename(spec):
+    return f"{spec['type']}_{'_'.join(spec['cols'])}.png"
+
+
+def chart_columns(df, spec):
+    """Columns of df a chart is drawn from (a one-column line also plots the first numeric column)."""
+    cols = [c for c in spec["cols"] if c in df.columns]
+    if spec["type"] == "line" and len(spec["cols"]) == 1:
+        cols += [c for c in df.select_dtypes(include="number").columns[:1] if c not in cols]
+    return cols
+
+
+def render_chart(df, spec, save_path, reducer=None, cube=None, series=None):
+    """
+    Render one suggestion spec to save_path without touching pyplot state.
+    Returns the ChartReducer metadata (what data reduction was applied).
+    Category charts are read from cube (AggregateCube) when it covers them,
+    line charts from series ({datetime column: TimeSeriesIndex}).
+    """
+    from matplotlib.figure import Figure
+
+    reducer = reducer or ChartReducer()
+    chart_type = spec["type"]
+    cols = spec["cols"]
+    fig = Figure(figsize=CHART_FIGSIZE)
+    ax = fig.subplots()
+    meta = None
+
+    if chart_type == "hist":
+        meta = reducer.hist(ax, df[cols[0]], bins=20)
+    elif chart_type == "box":
+        df[cols[0]].plot(kind="box", ax=ax)
+    elif chart_type in ["bar", "bar_top"]:
+        values, total = top_values(df, cols, cube)
+        values.plot(kind="bar", ax=ax)
+        if len(cols) == 2:
+            ax.set_ylabel(f"sum of {cols[1]}")
+        meta = _category_meta("bar", cols, df, values, total)
+    elif chart_type == "pie":
+        values, total = top_values(df, cols, cube)
+        values.plot(kind="pie", ax=ax, autopct="%1.1f%%")
+        ax.set_ylabel("")
+        meta = _category_meta("pie", cols, df, values, total)
+    elif chart_type == "box_group" and len(cols) == 2:
+        num, cat = cols
+        boxes = cube.box_stats(cat, num, top=10) if cube is not None else None
+        if boxes is not None:
+            ax.bxp(boxes, showfliers=False)
+            # same boxes and whiskers as the raw path; the outliers beyond the whiskers are not kept
+            meta = {"chart": "box_group", "reduction": "quantile_grid", "input_points": int(len(df)),
+                    "output_points": 5 * len(boxes), "fliers": "omitted"}
+        else:
+            top = df[cat].value_counts().head(10).index
+            groups = df[df[cat].isin(top)].groupby(cat, observed=True)[num]
+            ax.boxplot([g.dropna().to_numpy() for _, g in groups])
+            ax.set_xticks(range(1, groups.ngroups + 1), [str(k) for k, _ in groups])
+        ax.set_ylabel(num)
+        ax.tick_params(axis="x", rotation=45)
+    elif chart_type == "scatter" and len(cols) == 2:
+        meta = reducer.scatter(ax, df[cols[0]], df[cols[1]])
+        ax.set_xlabel(cols[0])
+        ax.set_ylabel(cols[1])
+    elif chart_type == "line" and len(cols) in (1, 2):
+        num_cols = cols[1:] or list(df.select_dtypes(include="number").columns)
+        index = (series or {}).get(cols[0])
+        if len(num_cols) > 0 and index is not None and num_cols[0] in index.numeric:
+            meta = trend_line(ax, index, num_cols[0], reducer, df=df)
+        elif len(num_cols) > 0:
+            if len(df) > reducer.max_points:
+                meta = reducer.line(ax, df[cols[0]], df[num_cols[0]], label=num_cols[0])
+                ax.legend()
+            else:
+                df.sort_values(cols[0]).plot(x=cols[0], y=num_cols[0], kind="line", ax=ax)
+
+    ax.set_title(f"{chart_type.title()} — {', '.join(cols)}")
+    annotate(fig, meta)
+    fig.tight_layout()
+    # write beside save_path and swap it in: save_path may be a hardlink into the chart cache
+    root, ext = os.path.splitext(save_path)
+    tmp = f"{root}.tmp{ext}"
+    fig.savefig(tmp, metadata=png_metadata(meta))
+    os.replace(tmp, save_path)
+    return meta
+
+
+def top_values(df, cols, cube=None, top=10):
+    """
+    Top categories of cols[0] by count, or by sum of cols[1], from cube when
+    it has them; returns (values, number of categories in all).
+    """
+    if len(cols) == 2:
+        ranked = cube.sums(cols[0], cols[1]) if cube is not None else None
+        if ranked is None:
+            ranked = df.groupby(cols[0], observed=True)[cols[1]].sum().sort_values(ascending=False, kind="mergesort")
+    else:
+        ranked = cube.category_counts.get(cols[0]) if cube is not None else None  # cut to max_categories
+        if ranked is None:
+            ranked = df[cols[0]].value_counts()
+    return ranked.iloc[:top], len(ranked)
+
+
+def _category_meta(chart, cols, df, values, total):
+    """Reduction metadata for a top-categories chart: "none" when every category is drawn."""
+    method = ("group_sum" if len(cols) == 2 else "value_counts") if len(values) < total else "none"
+    return {"chart": chart, "reduction": method, "input_points": int(len(df)), "output_points": int(len(values))}
+
+
+def trend_line(ax, index, column, reducer, freqs=("D", "W", "M"), df=None):
+    """
+    Plot column over index's time axis: the raw rows in time order when
+    they fit reducer.max_points, otherwise the mean per day (or week, month)
+    read from the index's rollups. df is the indexed frame, used for the
+    raw rows when the index was pickled without them (process-pool renders).
+    """
+    raw = index.raw(column, df) if index.rows <= reducer.max_points else None
+    if raw is not None:
+        ax.plot(raw.index, raw.to_numpy(), label=column)
+        ax.legend()
+        return None
+    freq = next((f for f in freqs if index.buckets(f) <= reducer.max_points), freqs[-1])
+    trend = index.series(column, freq)
+    ax.plot(trend.index, trend.to_numpy(), label=f"{column} (mean per {freq})")
+    ax.legend()
+    return {"chart": "line", "reduction": f"rollup_{freq}", "input_points": int(index.rows),
+            "output_points": int(trend.notna().sum())}
+
+
+def _reads_rows(spec, cube=None, series=None):
+    """False for charts render_chart draws from aggregates: cube categories/boxes, time-series indexes, histograms."""
+    chart_type, cols = spec["type"], spec["cols"]
+    if chart_type == "hist":
+        return False  # one histogram pass (prebinned above max_points): cheaper than shipping the column
+    if chart_type == "line":
+        return not (series and cols and cols[0] in series)
+    if cube is None:
+        return True
+    if chart_type in ("bar", "bar_top", "pie"):
+        return not (cube.has(cols[0], cols[1]) if len(cols) == 2 else cube.has(cols[0]))
+    if chart_type == "box_group" and len(cols) == 2:
+        return cube.box_stats(cols[1], cols[0], top=10) is None
+    return True
+
+
+def _render_job(df, index, spec, save_path, reducer=None, cube=None, series=None):
+    try:
+        with span("render", rows=len(df), chart=spec["type"], cols=list(spec["cols"])):
+            meta = render_chart(df, spec, save_path, reducer, cube, series)
+        return save_path, None, meta
+    except Exception as e:
+        return None, str(e), None
+
+
+_WORKER_DF = None
+_WORKER_CUBE = None
+_WORKER_SERIES = None
+
+
+def _init_render_worker(df, cube=None, series=None):
+    global _WORKER_DF, _WORKER_CUBE, _WORKER_SERIES
+    import matplotlib
+    matplotlib.use("Agg")
+    _WORKER_DF = df
+    _WORKER_CUBE = cube
+    _WORKER_SERIES = series
+
+
+def _render_worker_job(index, spec, save_path, reducer=None):
+    return _render_job(_WORKER_DF, index, spec, save_path, reducer, _WORKER_CUBE, _WORKER_SERIES)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import pandas as pd
+from modules.logger import AppLogger
+
+CHART_CACHE_VERSION = 3  # bump when render_chart draws differently for the same inputs
+
+
+class ChartCache:
+    """
+    Content-addressed store of rendered chart PNGs. Keys combine the chart
+    spec, a fingerprint of every input column's data and the style/size
+    settings, so an identical chart is linked into a new run's folder
+    (hardlink, copy across filesystems) instead of being drawn again.
+    put() stores an independent copy of the rendered file, and renderers
+    replace their output files rather than writing into them, so neither
+    side can change the other's bytes through a shared link.
+    Each entry keeps its reduction metadata in a JSON sidecar. Entries are
+    evicted least recently used first once the PNGs pass max_bytes. Every
+    run gets a chart_manifest.json mapping its files to cache entries, and
+    runs.jsonl in the cache lists the runs that used each entry.
+    """
+
+    def __init__(self, cache_dir="cache/charts", max_bytes=512 * 1024 ** 2):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ============================================================
+    #  Keys
+    # ============================================================
+    @staticmethod
+    def column_fingerprint(series):
+        """Hash of a column's name, dtype and every value."""
+        digest = hashlib.sha1(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        digest.update(repr((str(series.name), str(series.dtype), len(series))).encode())
+        return digest.hexdigest()
+
+    def key(self, spec, fingerprints, style=None):
+        """fingerprints: {column: column_fingerprint} for the chart's input columns."""
+        meta = {
+            "version": CHART_CACHE_VERSION,
+            "type": spec["type"],
+            "cols": [str(c) for c in spec["cols"]],
+            "data": fingerprints,
+            "style": style or {},
+        }
+        return hashlib.sha1(json.dumps(meta, sort_keys=True, default=str).encode()).hexdigest()
+
+    # ============================================================
+    #  Get / Put
+    # ============================================================
+    def fetch(self, key, dest):
+        """Link the cached chart for key to dest; returns its sidecar record, or None on a miss."""
+        path = self._png(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            with open(self._sidecar(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+            self._link(path, dest)
+            os.utime(path)  # mark as recently used
+            self.hits += 1
+            return record
+        except Exception as e:
+            self.logger.log_error("ChartCache.fetch", f"{key} | {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key, src, spec=None, meta=None):
+        """Store the chart rendered at src under key and enforce the size budget."""
+        try:
+            tmp = self._png(key) + ".tmp"
+            shutil.copy2(src, tmp)  # own copy: a later savefig over src must not change the entry
+            with open(self._sidecar(key), "w", encoding="utf-8") as f:
+                json.dump({"spec": spec, "meta": meta, "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                          f, default=str)
+            os.replace(tmp, self._png(key))
+            self.evict()
+            return self._png(key)
+        except Exception as e:
+            self.logger.log_error("ChartCache.put", f"{key} | {e}")
+            return None
+
+    def evict(self):
+        """Delete least recently used charts until under max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".png") and os.path.isfile(path):
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, name[:-4]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    # ============================================================
+    #  Run manifests
+    # ============================================================
+    def write_manifest(self, output_dir, charts):
+        """
+        charts: [{file, spec, key, cached}] for one run. Writes
+        <output_dir>/chart_manifest.json and appends the run to runs.jsonl.
+        """
+        manifest = {
+            "run": os.path.abspath(output_dir),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cache_dir": os.path.abspath(self.cache_dir),
+            "charts": [dict(c, artifact=os.path.abspath(self._png(c["key"]))) for c in charts],
+        }
+        path = os.path.join(output_dir, "chart_manifest.json")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=4, default=str)
+            with open(os.path.join(self.cache_dir, "runs.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"run": manifest["run"], "created": manifest["created"], "manifest": path,
+                                    "keys": [c["key"] for c in charts]}) + "\n")
+            return path
+        except Exception as e:
+            self.logger.log_error("ChartCache.write_manifest", str(e))
+            return None
+
+    # ============================================================
+    #  Files
+    # ============================================================
+    def _png(self, key):
+        return os.path.join(self.cache_dir, key + ".png")
+
+    def _sidecar(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _link(self, src, dest):
+        if os.path.exists(dest):
+            if os.path.samefile(src, dest):
+                return
+            os.remove(dest)
+        try:
+            os.link(src, dest)
+        except OSError:  # other filesystem, or links not supported
+            shutil.copy2(src, dest)
+
+    def _remove(self, key):
+        for path in (self._png(key), self._sidecar(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
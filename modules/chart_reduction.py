@@ -0,0 +1,109 @@
+import json
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 50_000
+
+
+class ChartReducer:
+    """
+    Shrinks chart data before it reaches matplotlib. Above max_points,
+    scatter plots become a 2D-histogram density, lines are decimated with
+    LTTB (largest-triangle-three-buckets) and histograms are drawn from
+    pre-binned counts. Every draw call returns a metadata dict describing
+    what (if anything) was reduced.
+    """
+
+    def __init__(self, max_points=DEFAULT_MAX_POINTS, scatter_bins=200, line_points=2000):
+        self.max_points = max_points
+        self.scatter_bins = scatter_bins
+        self.line_points = line_points
+
+    # ============================================================
+    #  Scatter → 2D histogram
+    # ============================================================
+    def scatter(self, ax, x, y, **kwargs):
+        x, y = self._paired_numeric(x, y)
+        n = int(len(x))
+        if n <= self.max_points:
+            ax.scatter(x, y, **kwargs)
+            return self._meta("scatter", "none", n, n)
+        counts, xedges, yedges = np.histogram2d(x, y, bins=self.scatter_bins)
+        mesh = ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap="viridis")
+        ax.figure.colorbar(mesh, ax=ax, label="points per bin")
+        return self._meta("scatter", "hist2d", n, int(np.count_nonzero(counts)),
+                          bins=[self.scatter_bins, self.scatter_bins])
+
+    # ============================================================
+    #  Line → LTTB
+    # ============================================================
+    def line(self, ax, x, y, label=None):
+        frame = pd.DataFrame({"x": x, "y": pd.to_numeric(y, errors="coerce")}).dropna().sort_values("x")
+        n = int(len(frame))
+        if n <= self.max_points:
+            ax.plot(frame["x"], frame["y"], label=label)
+            return self._meta("line", "none", n, n)
+        xs = frame["x"]
+        is_time = pd.api.types.is_datetime64_any_dtype(xs)
+        xnum = xs.astype("int64").to_numpy(dtype=float) if is_time else pd.to_numeric(xs).to_numpy(dtype=float)
+        idx = lttb_indices(xnum, frame["y"].to_numpy(dtype=float), self.line_points)
+        ax.plot(xs.iloc[idx], frame["y"].iloc[idx], label=label)
+        return self._meta("line", "lttb", n, int(len(idx)))
+
+    # ============================================================
+    #  Histogram → pre-binned counts
+    # ============================================================
+    def hist(self, ax, values, bins=20):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=float)
+        n = int(values.size)
+        if n <= self.max_points:
+            ax.hist(values, bins=bins)
+            return self._meta("hist", "none", n, n)
+        counts, edges = np.histogram(values, bins=bins)
+        ax.stairs(counts, edges, fill=True)
+        return self._meta("hist", "prebinned", n, int(counts.size))
+
+    # ============================================================
+    #  Helpers
+    # ============================================================
+    def _paired_numeric(self, x, y):
+        frame = pd.DataFrame({"x": pd.to_numeric(x, errors="coerce"),
+                              "y": pd.to_numeric(y, errors="coerce")}).dropna()
+        return frame["x"].to_numpy(dtype=float), frame["y"].to_numpy(dtype=float)
+
+    def _meta(self, chart, method, input_points, output_points, **extra):
+        return {"chart": chart, "reduction": method, "input_points": input_points,
+                "output_points": output_points, **extra}
+
+
+def annotate(fig, meta):
+    """Add a small footnote to fig when its data was reduced."""
+    if meta and meta.get("reduction", "none") != "none":
+        fig.text(0.99, 0.01, f"{meta['reduction']}: {meta['input_points']:,} → {meta['output_points']:,} points",
+                 ha="right", va="bottom", fontsize=7, alpha=0.7)
+
+
+def png_metadata(meta):
+    """PNG text chunk carrying the reduction metadata."""
+    return {"Description": json.dumps(meta)} if meta else None
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling; returns indices into x/y (x sorted)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:nxt_end].mean() if nxt_end > end else x[-1]
+        avg_y = y[end:nxt_end].mean() if nxt_end > end else y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
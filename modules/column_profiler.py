@@ -0,0 +1,108 @@
+import hashlib
+import warnings
+from collections import OrderedDict
+import pandas as pd
+
+SAMPLE_SIZE = 10    # values tested for datetime-looking text
+SAMPLE_VALUES = 5   # distinct examples shown per column
+
+
+class ColumnProfiler:
+    """
+    Builds the per-column profile used by DataProcessor.analyze_columns
+    (dtype, kind, missing, unique, sample_values).
+
+    The kind comes straight from the dtype where it can (numeric, bool,
+    datetime64); only text-like columns have a few leading values parsed as
+    dates. missing and unique are computed for all columns that need them
+    in one vectorised pass, and samples are taken from a growing window at
+    the top of the column instead of a full dropna()/astype(str) copy.
+    Profiles are cached by a hash of the column's name, dtype, length and
+    every value, so analysing an unchanged frame again only costs the hash
+    (far cheaper than nunique), and any edited cell misses the cache.
+    """
+
+    def __init__(self, cache_size=1024, threshold=0.6):
+        self.cache_size = cache_size
+        self.threshold = threshold
+        self._cache = OrderedDict()
+        self.last_hits = 0
+
+    def profile(self, df):
+        keys = {col: self._fingerprint(col, df[col]) for col in df.columns}
+        todo = [col for col in df.columns if keys[col] not in self._cache]
+        self.last_hits = len(df.columns) - len(todo)
+
+        if todo:
+            sub = df[todo]
+            missing = sub.isna().sum()
+            unique = sub.nunique(dropna=True)
+            for col in todo:
+                series = df[col]
+                self._store(keys[col], {
+                    "dtype": str(series.dtype),
+                    "kind": self._kind(series),
+                    "missing": int(missing[col]),
+                    "unique": int(unique[col]),
+                    "sample_values": self._sample_values(series),
+                })
+
+        info = {}
+        for col in df.columns:
+            self._cache.move_to_end(keys[col])
+            info[col] = dict(self._cache[keys[col]], sample_values=list(self._cache[keys[col]]["sample_values"]))
+        return info
+
+    # ============================================================
+    #  Kind detection
+    # ============================================================
+    def _kind(self, series):
+        if pd.api.types.is_bool_dtype(series):
+            return "categorical"
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        if pd.api.types.is_numeric_dtype(series):
+            return "numeric"
+        sample = self._head_non_null(series, SAMPLE_SIZE)
+        if len(sample):
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="Could not infer format", category=UserWarning)
+                parsed = pd.to_datetime(sample.astype(str), errors="coerce")
+            if parsed.notna().sum() >= len(sample) * self.threshold:
+                return "datetime"
+        return "categorical"
+
+    # ============================================================
+    #  Sampling without full-column copies
+    # ============================================================
+    def _head_non_null(self, series, k):
+        """First k non-null values, scanning a window that grows 4x until enough are found."""
+        window = max(k * 4, 64)
+        while True:
+            head = series.iloc[:window].dropna()
+            if len(head) >= k or window >= len(series):
+                return head.iloc[:k]
+            window *= 4
+
+    def _sample_values(self, series):
+        """First SAMPLE_VALUES distinct non-null values (as text), in order of appearance."""
+        window = 256
+        while True:
+            values = pd.unique(series.iloc[:window].dropna().astype(str))
+            if len(values) >= SAMPLE_VALUES or window >= len(series):
+                return values[:SAMPLE_VALUES].tolist()
+            window *= 8
+
+    # ============================================================
+    #  Fingerprints / cache
+    # ============================================================
+    def _fingerprint(self, col, series):
+        """Hash of every value plus name, dtype and length: in-place edits change it too."""
+        digest = hashlib.sha1(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        digest.update(repr((str(col), str(series.dtype), len(series))).encode())
+        return digest.hexdigest()
+
+    def _store(self, key, profile):
+        self._cache[key] = profile
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
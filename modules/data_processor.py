@@ -1,47 +1,39 @@
 import pandas as pd
 import numpy as np
 from modules.logger import AppLogger
+from modules.type_inference import TypeInferencer
+from modules.dtype_optimizer import DtypeOptimizer
+from modules.column_profiler import ColumnProfiler
+from modules.instrumentation import span, traced, frame_rows
 
 pd.options.mode.chained_assignment = None  # suppress warnings
+if hasattr(pd.options.mode, "copy_on_write"):
+    pd.options.mode.copy_on_write = True  # derived frames share memory until written to
+
+# Bump when clean_data's behaviour changes so cached cleaned frames are invalidated.
+CLEAN_CONFIG = {"version": 2}
 
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, cache=None, workers=None):
         self.logger = AppLogger("logs/error_log.txt")
+        self.cache = cache  # optional DatasetCache
+        self.inferencer = TypeInferencer(workers=workers)
+        self.profiler = ColumnProfiler()
+        self.last_inference = {}
+        self.last_memory_report = None
 
+    @traced("analyze", rows=frame_rows)
     def analyze_columns(self, df):
         """Return summary: inferred kind, missing, unique, and sample values."""
-        info = {}
         try:
-            for col in df.columns:
-                series = df[col]
-                missing = int(series.isna().sum())
-                unique = int(series.nunique(dropna=True))
-                dtype = str(series.dtype)
-
-                # Detect data kind
-                kind = "numeric" if pd.api.types.is_numeric_dtype(series) else "categorical"
-
-                # Try to detect datetime
-                if series.dropna().shape[0] > 0:
-                    sample = series.dropna().astype(str).iloc[:10]
-                    import warnings
-                    warnings.filterwarnings("ignore", message="Could not infer format", category=UserWarning, module="pandas")
-                    parsed = pd.to_datetime(sample, errors="coerce")
-                    if parsed.notna().sum() >= len(sample) * 0.6:
-                        kind = "datetime"
-
-                info[col] = {
-                    "dtype": dtype,
-                    "kind": kind,
-                    "missing": missing,
-                    "unique": unique,
-                    "sample_values": series.dropna().astype(str).unique()[:5].tolist(),
-                }
+            info = self.profiler.profile(df)
 
             # ✅ Log basic structure summary
             self.logger.log_info("DataProcessor.analyze_columns", f"Columns analyzed: {list(df.columns)}")
             self.logger.log_info("DataProcessor.analyze_columns", f"Detected data kinds: {[info[c]['kind'] for c in info]}")
+            if self.profiler.last_hits:
+                self.logger.log_info("DataProcessor.analyze_columns", f"Cached profiles reused: {self.profiler.last_hits}")
 
             return info
 
@@ -49,68 +41,151 @@ class DataProcessor:
             self.logger.log_error("DataProcessor.analyze_columns", str(e))
             return {}
 
-    def clean_data(self, df):
-        """Clean dataset: trim strings, detect numeric, fill missing, log stats."""
+    @traced("clean", rows=frame_rows)
+    def clean_data(self, df, cache_key=None, compact=False):
+        """
+        Clean dataset: trim strings, detect numeric, fill missing, log stats.
+        cache_key (FileHandler.last_cache_key) lets the result be served from
+        and stored in the DatasetCache. With compact=True, text columns with
+        nothing to fill from stay <NA> instead of "UNKNOWN" and the result goes
+        through DtypeOptimizer (report kept in last_memory_report).
+        """
+        clean_key = None
+        self.last_memory_report = None
+        if self.cache is not None and cache_key:
+            clean_key = self.cache.derived_key(cache_key, "cleaned", {**CLEAN_CONFIG, "compact": compact})
+            cached = self.cache.get(clean_key)
+            if cached is not None:
+                self.logger.log_info("DataProcessor.clean_data", "Cleaned data loaded from cache.")
+                return cached
         try:
-            df = df.copy()
-            df = df.drop_duplicates(ignore_index=True)
+            with span("clean.dedupe", rows=len(df)):
+                # Copy-on-write: the caller's frame is never modified, so no up-front copy
+                df = df.drop_duplicates(ignore_index=True)
 
             # Clean text columns
-            for col in df.select_dtypes(include=["object"]).columns:
-                df[col] = df[col].astype(str).str.strip()
-                df[col] = df[col].replace({"": pd.NA, "nan": pd.NA})
-
-            # Detect numeric columns
-            for col in df.columns:
-                s = df[col].dropna().astype(str)
-                if len(s) > 0:
-                    numeric_ratio = s.str.match(r"^-?\d+(\.\d+)?$").mean()
-                    if numeric_ratio > 0.6:
-                        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-            # Detect datetimes
-            for col in df.columns:
-                if df[col].dtype == object:
-                    parsed = pd.to_datetime(df[col], errors="coerce")
-                    if parsed.notna().mean() > 0.6:
-                        df[col] = parsed
+            with span("clean.text", rows=len(df)):
+                for col in df.select_dtypes(include=["object"]).columns:
+                    df[col] = df[col].astype(str).str.strip()
+                    df[col] = df[col].replace({"": pd.NA, "nan": pd.NA, "None": pd.NA})
+
+            # Infer column types from one sample per column, convert only what needs it
+            with span("clean.types", rows=len(df)):
+                decisions = self.inferencer.infer(df)
+                df = self.inferencer.apply(df, decisions)
+                self.last_inference = decisions
+                converted = {c: d["kind"] for c, d in decisions.items() if d["action"]}
+                self.logger.log_info("DataProcessor.clean_data.types", f"Converted columns: {converted}")
 
             # Fill missing values
-            for col in df.columns:
-                if df[col].isna().sum() == 0:
-                    continue
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    median = df[col].median()
-                    df[col] = df[col].fillna(median)
-                elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                    df[col] = df[col].fillna(method="ffill").fillna(method="bfill")
-                else:
-                    mode = df[col].mode(dropna=True)
-                    if not mode.empty:
-                        df[col] = df[col].fillna(mode.iloc[0])
+            with span("clean.fill", rows=len(df)):
+                missing = df.isna().sum()
+                for col in missing[missing > 0].index:
+                    if pd.api.types.is_bool_dtype(df[col]):
+                        mode = df[col].mode(dropna=True)
+                        if not mode.empty:
+                            df[col] = df[col].fillna(mode.iloc[0])
+                    elif pd.api.types.is_numeric_dtype(df[col]):
+                        median = df[col].median()
+                        df[col] = df[col].fillna(median)
+                    elif pd.api.types.is_datetime64_any_dtype(df[col]):
+                        df[col] = df[col].ffill().bfill()
                     else:
-                        df[col] = df[col].fillna("UNKNOWN")
+                        mode = df[col].mode(dropna=True)
+                        if not mode.empty:
+                            df[col] = df[col].fillna(mode.iloc[0])
+                        elif not compact:
+                            df[col] = df[col].fillna("UNKNOWN")
 
             # ✅ Log statistical summary
-            stats_log = []
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-            for col in numeric_cols:
-                col_stats = df[col].describe().to_dict()
-                stats_log.append(f"Column '{col}': mean={col_stats.get('mean'):.2f}, std={col_stats.get('std'):.2f}, min={col_stats.get('min')}, max={col_stats.get('max')}, median={df[col].median():.2f}")
-
-            categorical_cols = df.select_dtypes(include=["object"]).columns.tolist()
-            for col in categorical_cols:
-                top_val = df[col].mode()[0] if not df[col].mode().empty else "N/A"
-                freq = df[col].value_counts().head(1).values[0] if not df[col].value_counts().empty else 0
-                stats_log.append(f"Column '{col}': top='{top_val}', frequency={freq}")
-
-            for entry in stats_log:
-                self.logger.log_info("DataProcessor.clean_data.stats", entry)
+            with span("clean.stats", rows=len(df)):
+                stats_log = []
+                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+                for col in numeric_cols:
+                    col_stats = df[col].describe().to_dict()
+                    stats_log.append(f"Column '{col}': mean={col_stats.get('mean'):.2f}, std={col_stats.get('std'):.2f}, min={col_stats.get('min')}, max={col_stats.get('max')}, median={df[col].median():.2f}")
+
+                categorical_cols = df.select_dtypes(include=["object"]).columns.tolist()
+                for col in categorical_cols:
+                    top_val = df[col].mode()[0] if not df[col].mode().empty else "N/A"
+                    freq = df[col].value_counts().head(1).values[0] if not df[col].value_counts().empty else 0
+                    stats_log.append(f"Column '{col}': top='{top_val}', frequency={freq}")
+
+                for entry in stats_log:
+                    self.logger.log_info("DataProcessor.clean_data.stats", entry)
 
             self.logger.log_info("DataProcessor.clean_data", "Data cleaned and stats logged successfully.")
 
+            # Compact dtypes (category / Arrow strings / downcast numerics)
+            if compact:
+                with span("clean.compact", rows=len(df)):
+                    df, self.last_memory_report = DtypeOptimizer().optimize(df)
+
+            if clean_key:
+                self.cache.put(clean_key, df)
             return df
 
         except Exception as e:
             self.logger.log_error("DataProcessor.clean_data", str(e))
             return df
+
+    # ============================================================
+    #  Streaming cleaning (chunks from FileHandler.iter_chunks)
+    # ============================================================
+    def clean_chunks(self, chunks):
+        """
+        Clean an iterator of DataFrame chunks, yielding cleaned chunks.
+        Column types and fill values are decided on the first chunk and
+        reused for the rest so every chunk comes out with the same schema.
+        Duplicates are only dropped within a chunk. Errors (including read
+        errors from the chunk source) are logged and re-raised.
+        """
+        schema = None
+        try:
+            for chunk in chunks:
+                if schema is None:
+                    cleaned = self.clean_data(chunk)
+                    schema = self.build_schema(cleaned)
+                else:
+                    cleaned = self.clean_with_schema(chunk, schema)
+                yield cleaned
+        except Exception as e:
+            self.logger.log_error("DataProcessor.clean_chunks", str(e))
+            raise
+
+    def build_schema(self, df):
+        """Return {col: (kind, fill_value)} from an already cleaned frame."""
+        schema = {}
+        for col in df.columns:
+            s = df[col]
+            if pd.api.types.is_bool_dtype(s):
+                mode = s.mode(dropna=True)
+                schema[col] = ("boolean", mode.iloc[0] if not mode.empty else None)
+            elif pd.api.types.is_numeric_dtype(s):
+                schema[col] = ("numeric", s.median() if s.notna().any() else None)
+            elif pd.api.types.is_datetime64_any_dtype(s):
+                schema[col] = ("datetime", s.iloc[-1] if len(s) else None)
+            else:
+                mode = s.mode(dropna=True)
+                schema[col] = ("text", mode.iloc[0] if not mode.empty else "UNKNOWN")
+        return schema
+
+    def clean_with_schema(self, df, schema):
+        """Clean new rows so they match a schema from build_schema (updated in place)."""
+        df = df.drop_duplicates(ignore_index=True)
+        for col, (kind, fill) in schema.items():
+            if col not in df.columns:
+                continue
+            if kind == "numeric":
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+            elif kind == "boolean":
+                df[col] = self.inferencer._convert(df[col], {"action": "to_boolean"})
+            elif kind == "datetime":
+                df[col] = pd.to_datetime(df[col], errors="coerce").ffill()
+                if len(df[col]):
+                    schema[col] = (kind, df[col].iloc[-1] if df[col].notna().any() else fill)
+            else:
+                df[col] = df[col].astype(str).str.strip().replace({"": pd.NA, "nan": pd.NA, "None": pd.NA})
+            if fill is not None:
+                df[col] = df[col].fillna(fill)
+        return df
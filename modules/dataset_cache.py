@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from modules.logger import AppLogger
+
+
+class DatasetCache:
+    """
+    Content-addressed on-disk cache for loaded ("raw") and cleaned frames.
+    Entries are keyed on the source file's hash, size and mtime plus an
+    optional config dict, stored as Parquet (pickle if pyarrow is missing
+    or the frame cannot be written as Parquet), and evicted least recently
+    used first once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir="cache/datasets", max_bytes=5 * 1024 ** 3):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ============================================================
+    #  Keys
+    # ============================================================
+    def file_key(self, filepath, config=None):
+        """Return a key for the file's current content plus config."""
+        stat = os.stat(filepath)
+        digest = hashlib.sha1()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        meta = {
+            "sha1": digest.hexdigest(),
+            "size": stat.st_size,
+            "mtime": int(stat.st_mtime),
+            "config": config or {},
+        }
+        return hashlib.sha1(json.dumps(meta, sort_keys=True, default=str).encode()).hexdigest()
+
+    def derived_key(self, key, stage, config=None):
+        """Key for a frame derived from another cached frame (e.g. cleaned)."""
+        meta = {"parent": key, "stage": stage, "config": config or {}}
+        return hashlib.sha1(json.dumps(meta, sort_keys=True, default=str).encode()).hexdigest()
+
+    # ============================================================
+    #  Get / Put
+    # ============================================================
+    def get(self, key):
+        """Return the cached DataFrame for key, or None on a miss."""
+        for ext, reader in ((".parquet", pd.read_parquet), (".pkl", pd.read_pickle)):
+            path = os.path.join(self.cache_dir, key + ext)
+            if os.path.exists(path):
+                try:
+                    df = reader(path)
+                    os.utime(path)  # mark as recently used
+                    self.logger.log_info("DatasetCache.get", f"Cache hit {key}{ext}")
+                    return df
+                except Exception as e:
+                    self.logger.log_error("DatasetCache.get", f"{path} | {e}")
+                    self._remove(path)
+        return None
+
+    def put(self, key, df):
+        """Store df under key and enforce the disk budget."""
+        path = os.path.join(self.cache_dir, key + ".parquet")
+        try:
+            try:
+                self._atomic_write(path, lambda tmp: df.to_parquet(tmp, index=True))
+            except Exception:
+                path = os.path.join(self.cache_dir, key + ".pkl")
+                self._atomic_write(path, lambda tmp: df.to_pickle(tmp))
+            self.logger.log_info("DatasetCache.put", f"Cached {os.path.basename(path)}")
+            self.evict()
+            return path
+        except Exception as e:
+            self.logger.log_error("DatasetCache.put", str(e))
+            return None
+
+    def evict(self):
+        """Delete least recently used entries until under max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith((".parquet", ".pkl")) and os.path.isfile(path):
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _atomic_write(self, path, writer):
+        tmp = path + ".tmp"
+        try:
+            writer(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,79 @@
+import threading
+
+
+class DatasetContext:
+    """
+    One dataset as it moves through the app: the current frame plus values
+    derived from it (column analysis, summaries, ...), so each stage reuses
+    what an earlier stage computed instead of recomputing it on another copy.
+
+    Derived values are memoised per frame version. replace() installs a new
+    frame and drops them; a change to the frame's structure made in place
+    (shape, columns or dtypes) is detected and drops them too. Cell edits
+    made in place are not detected - call invalidate() after those.
+    """
+
+    def __init__(self, df=None, source=None, cache_key=None):
+        self._lock = threading.RLock()
+        self.source = source
+        self.cache_key = cache_key
+        self.cleaned = False
+        self.version = 0
+        self._df = None
+        self._derived = {}
+        self._signature = None
+        if df is not None:
+            self.replace(df)
+
+    @property
+    def df(self):
+        return self._df
+
+    def replace(self, df, cleaned=None, **derived):
+        """Install a new frame (optionally with values already derived from it)."""
+        with self._lock:
+            self._df = df
+            self.version += 1
+            self._derived = dict(derived)
+            self._signature = self._structure(df)
+            if cleaned is not None:
+                self.cleaned = cleaned
+        return self
+
+    def invalidate(self):
+        with self._lock:
+            self._derived.clear()
+            self.version += 1
+            self._signature = self._structure(self._df)
+
+    def cached(self, name, compute):
+        """Return the memoised value for name, computing it from the current frame on a miss."""
+        with self._lock:
+            self._check()
+            if name not in self._derived:
+                self._derived[name] = compute(self._df)
+            return self._derived[name]
+
+    def put(self, name, value):
+        with self._lock:
+            self._check()
+            self._derived[name] = value
+
+    def peek(self, name, default=None):
+        with self._lock:
+            self._check()
+            return self._derived.get(name, default)
+
+    def analysis_info(self, processor):
+        """Column analysis for the current frame (DataProcessor.analyze_columns, run at most once)."""
+        return self.cached("analysis_info", processor.analyze_columns)
+
+    def _check(self):
+        if self._df is not None and self._structure(self._df) != self._signature:
+            self.invalidate()
+
+    @staticmethod
+    def _structure(df):
+        if df is None:
+            return None
+        return id(df), df.shape, tuple(map(str, df.columns)), tuple(map(str, df.dtypes))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from modules.logger import AppLogger
+
+
+def _arrow_strings_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class DtypeOptimizer:
+    """
+    Shrink a cleaned frame's memory footprint without changing its values:
+    low-cardinality text → category, other text → Arrow-backed strings (or
+    pandas' nullable string dtype), integers → the smallest integer type,
+    floats → integers or float32 only where the round trip is exact.
+    """
+
+    def __init__(self, category_ratio=0.5, max_categories=50_000, arrow_strings=True):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.category_ratio = category_ratio
+        self.max_categories = max_categories
+        self.string_dtype = "string[pyarrow]" if arrow_strings and _arrow_strings_available() else "string"
+
+    def optimize(self, df):
+        """Return (optimized_df, report) where report has per-column bytes before/after."""
+        before = df.memory_usage(deep=True, index=False)
+        out = {}
+        for col in df.columns:
+            try:
+                out[col] = self._optimize_column(df[col])
+            except Exception as e:
+                self.logger.log_error("DtypeOptimizer.optimize", f"{col} | {e}")
+                out[col] = df[col]
+        result = pd.DataFrame(out, index=df.index)
+        after = result.memory_usage(deep=True, index=False)
+
+        columns = {
+            str(col): {"from": str(df[col].dtype), "to": str(result[col].dtype),
+                       "bytes_before": int(before[col]), "bytes_after": int(after[col])}
+            for col in df.columns
+        }
+        report = {"bytes_before": int(before.sum()), "bytes_after": int(after.sum()), "columns": columns}
+        self.logger.log_info("DtypeOptimizer.optimize",
+                             f"Memory {report['bytes_before'] / 1e6:.1f} MB → {report['bytes_after'] / 1e6:.1f} MB")
+        return result, report
+
+    def _optimize_column(self, s):
+        if pd.api.types.is_bool_dtype(s) or pd.api.types.is_datetime64_any_dtype(s) \
+                or isinstance(s.dtype, pd.CategoricalDtype):
+            return s
+        if pd.api.types.is_integer_dtype(s):
+            return self._downcast_int(s)
+        if pd.api.types.is_float_dtype(s):
+            return self._downcast_float(s)
+        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            return self._compact_text(s)
+        return s
+
+    def _downcast_int(self, s):
+        if s.isna().any():
+            return s
+        unsigned = s.min() >= 0
+        return pd.to_numeric(s, downcast="unsigned" if unsigned else "integer")
+
+    def _downcast_float(self, s):
+        values = s.to_numpy()
+        finite = values[~np.isnan(values)]
+        if finite.size == len(values) and finite.size and np.all(np.mod(finite, 1) == 0) \
+                and np.abs(finite).max() < 2 ** 53:
+            return self._downcast_int(s.astype(np.int64))
+        as32 = s.astype(np.float32)
+        if np.array_equal(as32.to_numpy(dtype=np.float64), values, equal_nan=True):
+            return as32
+        return s
+
+    def _compact_text(self, s):
+        non_null = s.dropna()
+        if non_null.empty:
+            return s.astype(self.string_dtype)
+        if not non_null.map(type).eq(str).all():
+            return s  # mixed Python objects: leave untouched
+        unique = non_null.nunique()
+        if unique <= self.max_categories and unique <= len(s) * self.category_ratio:
+            return s.astype("category")
+        return s.astype(self.string_dtype)
@@ -1,44 +1,334 @@
 import pandas as pd
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from modules.logger import AppLogger
+from modules.instrumentation import span
+from modules.process_pool import pool_context
+
+DEFAULT_CHUNK_ROWS = 100_000
+SHEET_COLUMN = "sheet"
+ARROW_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".feather": "ipc", ".arrow": "ipc", ".ipc": "ipc"}
+PARALLEL_SHEETS_MIN_BYTES = 2 * 1024 * 1024  # below this, process start-up costs more than it saves
+
+# Bump when parsing changes (sheet grouping, dtype handling, ...) so cached raw frames are invalidated.
+LOAD_CONFIG = {"version": 1}
+
+
+def excel_engine(filepath):
+    """Fastest installed engine for filepath: calamine if available, else pandas' default."""
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl" if filepath.lower().endswith(".xlsx") else None
+
+
+def _column_filter(usecols):
+    """usecols as a callable, so sheets/files missing some columns don't fail."""
+    if usecols is None:
+        return None
+    wanted = {str(c) for c in usecols}
+    return lambda c: str(c) in wanted
+
+
+def arrow_dataset(filepath):
+    """Open a Parquet / Feather / Arrow IPC file as a memory-mapped pyarrow dataset."""
+    try:
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+    except ImportError:
+        raise ValueError("Reading Parquet/Feather/Arrow files requires pyarrow")
+    fmt = ARROW_FORMATS[os.path.splitext(filepath)[1].lower()]
+    return ds.dataset(filepath, format=fmt, filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def arrow_filter(filters):
+    """pyarrow expression from [(col, op, value), ...] (AND) / [[...], [...]] (OR of ANDs), or an expression."""
+    if filters is None or not isinstance(filters, (list, tuple)):
+        return filters
+    import pyarrow.parquet as pq
+    return pq.filters_to_expression(filters)
+
+
+def _read_sheet(xls, sheet, usecols):
+    """Parse one sheet of an open pd.ExcelFile."""
+    return sheet, xls.parse(sheet, usecols=_column_filter(usecols))
+
+
+_WORKER_WORKBOOK = None
+
+
+def _open_worker_workbook(filepath, engine):
+    """Pool initializer: each worker opens the workbook once for all the sheets it reads."""
+    global _WORKER_WORKBOOK
+    _WORKER_WORKBOOK = pd.ExcelFile(filepath, engine=engine)
+
+
+def _read_worker_sheet(sheet, usecols):
+    return _read_sheet(_WORKER_WORKBOOK, sheet, usecols)
+
 
 class FileHandler:
-    def __init__(self):
+    def __init__(self, cache=None, workers=None):
         self.logger = AppLogger("logs/error_log.txt")
+        self.cache = cache  # optional DatasetCache
+        self.workers = workers or os.cpu_count() or 1
+        self.last_cache_key = None
+        self.last_sheet_groups = {}
 
-    def load_file(self, filepath, sheet_name=None):
+    def load_file(self, filepath, sheet_name=None, chunksize=None, max_chunk_mb=None, usecols=None,
+                  filters=None):
         """
-        Returns a pandas DataFrame. For Excel with multiple sheets,
-        concatenate similar sheets if possible.
+        Returns a pandas DataFrame. For Excel with multiple sheets, sheets
+        with the same columns are concatenated (with a "sheet" column); when
+        the workbook holds several different layouts, the largest group is
+        returned and every group is kept in last_sheet_groups.
+        usecols limits parsing to the named columns.
+        Parquet, Feather and Arrow IPC files are memory-mapped through
+        pyarrow: only the usecols columns are read, and filters (e.g.
+        [("Region", "==", "North")]) are pushed down so non-matching row
+        groups are skipped. These are not copied into the DatasetCache.
+        If chunksize or max_chunk_mb is given, returns an iterator of
+        DataFrame chunks instead (see iter_chunks).
         """
+        if chunksize or max_chunk_mb:
+            return self.iter_chunks(filepath, sheet_name=sheet_name, chunksize=chunksize,
+                                    max_chunk_mb=max_chunk_mb, usecols=usecols, filters=filters)
+        self.last_cache_key = None
+        self.last_sheet_groups = {}
         try:
             ext = os.path.splitext(filepath)[1].lower()
-            if ext == '.csv':
-                df = pd.read_csv(filepath)
-            elif ext in ['.xlsx', '.xls']:
-                xls = pd.ExcelFile(filepath)
-                if sheet_name:
-                    df = pd.read_excel(xls, sheet_name=sheet_name)
-                else:
-                    dfs = [pd.read_excel(xls, sheet_name=sh) for sh in xls.sheet_names]
-                    dfs = [d for d in dfs if not d.empty]
-                    if len(dfs) == 0:
-                        df = pd.DataFrame()
-                    elif len(dfs) == 1:
-                        df = dfs[0]
-                    else:
-                        try:
-                            df = pd.concat(dfs, ignore_index=True, sort=False)
-                        except Exception:
-                            df = dfs[0]
-            elif ext == '.json':
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                df = pd.DataFrame(data)
-            else:
-                raise ValueError("Unsupported file type")
+            if ext in ARROW_FORMATS:
+                with span("load", format=ext) as s:
+                    df = self._read_arrow(filepath, usecols, filters)
+                    s.rows = len(df)
+                return df
+            if filters is not None:
+                raise ValueError("filters are only supported for Parquet/Feather/Arrow files")
+            if self.cache is not None:
+                config = {**LOAD_CONFIG, "sheet_name": sheet_name,
+                          "usecols": sorted(map(str, usecols)) if usecols else None}
+                self.last_cache_key = self.cache.file_key(filepath, config)
+                df = self.cache.get(self.last_cache_key)
+                if df is not None:
+                    return df
+            with span("load", format=os.path.splitext(filepath)[1].lower()) as s:
+                df = self._read_file(filepath, sheet_name, usecols)
+                s.rows = len(df)
+            # A single frame only stands for the whole file when there is one sheet group
+            if self.cache is not None and len(self.last_sheet_groups) <= 1:
+                self.cache.put(self.last_cache_key, df)
             return df
         except Exception as e:
             self.logger.log_error("FileHandler.load_file", str(e))
             return None
+
+    def _read_file(self, filepath, sheet_name=None, usecols=None):
+        """Parse filepath into a DataFrame based on its extension."""
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext == '.csv':
+            df = pd.read_csv(filepath, usecols=_column_filter(usecols))
+        elif ext in ['.xlsx', '.xls']:
+            if sheet_name:
+                df = pd.read_excel(filepath, sheet_name=sheet_name, engine=excel_engine(filepath),
+                                   usecols=_column_filter(usecols))
+            else:
+                df = self._read_all_sheets(filepath, usecols)
+        elif ext in ['.jsonl', '.ndjson']:
+            df = pd.read_json(filepath, lines=True)
+        elif ext == '.json':
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            df = pd.DataFrame(data)
+        else:
+            raise ValueError("Unsupported file type")
+        if usecols is not None and ext not in ['.csv', '.xlsx', '.xls']:
+            df = df[[c for c in df.columns if str(c) in {str(u) for u in usecols}]]
+        return df
+
+    def _read_arrow(self, filepath, usecols=None, filters=None):
+        """Projected, filtered read of a columnar file; only the needed columns/row groups are touched."""
+        dataset = arrow_dataset(filepath)
+        columns = self._arrow_columns(dataset, usecols)
+        table = dataset.to_table(columns=columns, filter=arrow_filter(filters))
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def _arrow_columns(self, dataset, usecols):
+        if usecols is None:
+            return None
+        wanted = {str(c) for c in usecols}
+        return [name for name in dataset.schema.names if name in wanted]
+
+    # ============================================================
+    #  Multi-sheet Excel
+    # ============================================================
+    def _read_all_sheets(self, filepath, usecols=None):
+        """
+        Parse every sheet (in parallel when there are several), then group
+        sheets by column layout and concatenate each group.
+        """
+        engine = excel_engine(filepath)
+        with pd.ExcelFile(filepath, engine=engine) as xls:
+            sheets = xls.sheet_names
+            workers = min(self.workers, len(sheets))
+            if workers > 1 and os.path.getsize(filepath) >= PARALLEL_SHEETS_MIN_BYTES:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(),
+                                         initializer=_open_worker_workbook, initargs=(filepath, engine)) as pool:
+                    parsed = list(pool.map(_read_worker_sheet, sheets, [usecols] * len(sheets)))
+            else:
+                parsed = [_read_sheet(xls, sh, usecols) for sh in sheets]
+        parsed = [(name, d) for name, d in parsed if not d.empty]
+        if not parsed:
+            return pd.DataFrame()
+        if len(parsed) == 1:
+            self.last_sheet_groups = {parsed[0][0]: parsed[0][1]}
+            return parsed[0][1]
+
+        groups = {}
+        for name, d in parsed:
+            layout = tuple(sorted(str(c).strip().lower() for c in d.columns))
+            groups.setdefault(layout, []).append((name, d))
+
+        self.last_sheet_groups = {}
+        for members in groups.values():
+            label = members[0][0] if len(members) == 1 else f"{members[0][0]}..{members[-1][0]}"
+            self.last_sheet_groups[label] = self._concat_sheets(members)
+        if len(groups) > 1:
+            self.logger.log_info("FileHandler.load_file",
+                                 f"{os.path.basename(filepath)}: {len(parsed)} sheets in "
+                                 f"{len(groups)} layouts: {list(self.last_sheet_groups)}")
+        return max(self.last_sheet_groups.values(), key=len)
+
+    def _concat_sheets(self, members):
+        """Concatenate same-layout sheets, aligning columns to the first and tagging each row's sheet."""
+        first = members[0][1]
+        by_key = {str(c).strip().lower(): c for c in first.columns}
+        frames = []
+        for name, d in members:
+            d = d.rename(columns={c: by_key[str(c).strip().lower()] for c in d.columns})[list(first.columns)]
+            col = SHEET_COLUMN if SHEET_COLUMN not in d.columns else f"_{SHEET_COLUMN}"
+            frames.append(d.assign(**{col: name}))
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    # ============================================================
+    #  Streaming (chunked) loading
+    # ============================================================
+    def iter_chunks(self, filepath, sheet_name=None, chunksize=None, max_chunk_mb=None, usecols=None,
+                    filters=None):
+        """
+        Yield bounded-size DataFrame chunks from CSV, JSON Lines, Excel or
+        Parquet/Feather/Arrow (record batches, with projection and filters).
+        chunksize caps rows per chunk; max_chunk_mb caps the in-memory size
+        of each chunk (measured on the previous chunk and adapted).
+        Errors are logged and re-raised, so a read that stops part-way can
+        never pass for the complete file.
+        """
+        rows = int(chunksize or DEFAULT_CHUNK_ROWS)
+        max_bytes = int(max_chunk_mb * 1024 * 1024) if max_chunk_mb else None
+        try:
+            ext = os.path.splitext(filepath)[1].lower()
+            if ext == '.csv':
+                chunks = self._csv_chunks(filepath, rows, max_bytes, usecols)
+            elif ext in ARROW_FORMATS:
+                chunks = self._arrow_chunks(filepath, rows, usecols, filters)
+            elif ext in ['.jsonl', '.ndjson']:
+                chunks = pd.read_json(filepath, lines=True, chunksize=rows)
+            elif ext == '.xlsx':
+                chunks = self._excel_chunks(filepath, sheet_name, rows)
+            elif ext in ['.json', '.xls']:
+                # Plain JSON arrays and legacy .xls cannot be parsed
+                # incrementally, so load once and slice.
+                df = self.load_file(filepath, sheet_name=sheet_name, usecols=usecols)
+                if df is None:
+                    raise ValueError(f"failed to load {filepath}")
+                chunks = (df.iloc[i:i + rows] for i in range(0, len(df), rows))
+            else:
+                raise ValueError("Unsupported file type")
+
+            for chunk in chunks:
+                if usecols is not None and ext != '.csv' and ext not in ARROW_FORMATS:
+                    chunk = chunk[[c for c in chunk.columns if str(c) in {str(u) for u in usecols}]]
+                yield from self._bound_chunk(chunk, max_bytes)
+        except Exception as e:
+            self.logger.log_error("FileHandler.iter_chunks", str(e))
+            raise
+
+    def _csv_chunks(self, filepath, rows, max_bytes, usecols=None):
+        """Read a CSV incrementally, shrinking the row count to honour max_bytes."""
+        with pd.read_csv(filepath, iterator=True, usecols=_column_filter(usecols)) as reader:
+            while True:
+                try:
+                    chunk = reader.get_chunk(rows)
+                except StopIteration:
+                    return
+                if max_bytes and len(chunk):
+                    per_row = max(1, chunk.memory_usage(deep=True).sum() // len(chunk))
+                    rows = max(1, int(max_bytes // per_row))
+                yield chunk
+
+    def _arrow_chunks(self, filepath, rows, usecols=None, filters=None):
+        """Stream record batches from a memory-mapped columnar file."""
+        dataset = arrow_dataset(filepath)
+        for batch in dataset.to_batches(columns=self._arrow_columns(dataset, usecols),
+                                        filter=arrow_filter(filters), batch_size=rows):
+            if batch.num_rows:
+                yield batch.to_pandas(split_blocks=True)
+
+    def _excel_chunks(self, filepath, sheet_name, rows):
+        """
+        Stream rows of one or all sheets through openpyxl's read-only mode.
+        Every chunk of a stream must share one schema, so sheets are aligned
+        to the first sheet's columns, and a workbook whose sheets have
+        different column layouts is rejected (pass sheet_name to pick one).
+        """
+        from openpyxl import load_workbook
+
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            headers = {}
+            for name in ([sheet_name] if sheet_name else wb.sheetnames):
+                row_iter = wb[name].iter_rows(values_only=True)
+                header = next(row_iter, None)
+                if header is not None and next(row_iter, None) is not None:  # empty sheets are skipped
+                    headers[name] = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+            layouts = {}
+            for name, columns in headers.items():
+                layouts.setdefault(tuple(sorted(c.strip().lower() for c in columns)), []).append(name)
+            if len(layouts) > 1:
+                raise ValueError(f"{os.path.basename(filepath)}: sheets have {len(layouts)} column layouts "
+                                 f"{list(layouts.values())}; chunked reads need one, pass sheet_name")
+            if not headers:
+                return
+
+            first = next(iter(headers.values()))
+            by_key = {c.strip().lower(): c for c in first}
+            tag_sheets = len(headers) > 1 and SHEET_COLUMN not in first
+            for name, columns in headers.items():
+                aligned = [by_key[c.strip().lower()] for c in columns]
+                tag = {SHEET_COLUMN: name} if tag_sheets else {}
+                row_iter = wb[name].iter_rows(values_only=True)
+                next(row_iter)  # header
+                batch = []
+                for row in row_iter:
+                    batch.append(row)
+                    if len(batch) >= rows:
+                        yield pd.DataFrame(batch, columns=aligned)[first].assign(**tag)
+                        batch = []
+                if batch:
+                    yield pd.DataFrame(batch, columns=aligned)[first].assign(**tag)
+        finally:
+            wb.close()
+
+    def _bound_chunk(self, chunk, max_bytes):
+        """Split a chunk into slices no larger than max_bytes in memory."""
+        if not max_bytes or chunk.empty:
+            yield chunk
+            return
+        size = chunk.memory_usage(deep=True).sum()
+        if size <= max_bytes:
+            yield chunk
+            return
+        step = max(1, int(len(chunk) * max_bytes // size))
+        for i in range(0, len(chunk), step):
+            yield chunk.iloc[i:i + step]
@@ -0,0 +1,300 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+from modules.logger import AppLogger
+from modules.file_handler import FileHandler
+from modules.data_processor import DataProcessor
+from modules.analytics_engine import AnalyticsEngine, chart_filename
+from modules.accumulators import FrameAccumulator
+from modules.report_generator import ReportGenerator
+from modules.time_series import build_time_series
+
+STATE_VERSION = 4
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+class IncrementalProcessor:
+    """
+    Re-run the pipeline on a growing file, doing only the work the new rows need.
+
+    For CSV files the byte offset read so far is remembered together with a
+    SHA-1 of that whole prefix (hashing is I/O-bound, far cheaper than
+    parsing). When the file has only grown, just the appended bytes are
+    parsed and cleaned (with the schema and fill values fixed on the first
+    run), running aggregates and the time series rollups
+    (TimeSeriesIndex.update) are merged, and only charts whose input columns
+    changed are re-rendered. Anything else (other formats, edited, rewritten
+    or truncated files) falls back to a full run.
+    Duplicates are only dropped within the newly appended rows.
+    """
+
+    def __init__(self, state_dir="cache/incremental"):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.state_dir = state_dir
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.file_handler = FileHandler()
+        self.processor = DataProcessor()
+        self.analytics = AnalyticsEngine()
+
+    # ============================================================
+    #  Public entry point
+    # ============================================================
+    def update(self, filepath, output_dir=None, render_charts=True):
+        """
+        Bring results for filepath up to date. Returns a dict with the mode
+        used ("full", "append" or "unchanged"), new row count, the aggregate
+        summary, the numeric report and the charts that were (re)rendered.
+        """
+        state = self._load_state(filepath)
+        mode = self._detect(filepath, state)
+        output_dir = output_dir or os.path.join("output", "incremental", self._name(filepath))
+
+        if mode == "unchanged":
+            new_rows, changed = 0, []
+        elif mode == "append":
+            new_rows, changed = self._apply_append(filepath, state)
+        else:
+            state = self._full_run(filepath)
+            new_rows, changed = state["row_count"], list(state["columns"])
+
+        charts = []
+        if render_charts:
+            charts = self._render_changed_charts(filepath, state, output_dir)
+        self._save_state(filepath, state)
+
+        acc = FrameAccumulator.from_dict(state["accumulator"])
+        self.logger.log_info("IncrementalProcessor.update",
+                             f"{filepath} | mode={mode} | new_rows={new_rows} | charts={len(charts)}")
+        return {
+            "mode": mode,
+            "new_rows": new_rows,
+            "total_rows": state["row_count"],
+            "changed_columns": changed,
+            "summary": acc.summary(),
+            "report": self.numeric_report(acc),
+            "charts": charts,
+        }
+
+    def numeric_report(self, acc):
+        """Numeric report with ReportGenerator.numeric_summary's keys, from the merged accumulator."""
+        return ReportGenerator(self.state_dir).numeric_summary(acc)
+
+    # ============================================================
+    #  Change detection
+    # ============================================================
+    def _detect(self, filepath, state):
+        if state is None or state.get("version") != STATE_VERSION:
+            return "full"
+        if os.path.splitext(filepath)[1].lower() != ".csv":
+            return "full" if self._file_signature(filepath) != state.get("signature") else "unchanged"
+        size = os.path.getsize(filepath)
+        offset = state["byte_offset"]
+        if size < offset or self._prefix_hash(filepath, offset) != state["prefix_hash"]:
+            return "full"
+        return "unchanged" if size == offset else "append"
+
+    def _prefix_hash(self, filepath, offset):
+        """SHA-1 of the first `offset` bytes, read in HASH_BLOCK_BYTES blocks."""
+        digest = hashlib.sha1()
+        with open(filepath, "rb") as f:
+            remaining = offset
+            while remaining > 0:
+                block = f.read(min(HASH_BLOCK_BYTES, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest.hexdigest()
+
+    def _file_signature(self, filepath):
+        st = os.stat(filepath)
+        return [st.st_size, int(st.st_mtime)]
+
+    # ============================================================
+    #  Full and append runs
+    # ============================================================
+    def _full_run(self, filepath):
+        size = os.path.getsize(filepath)
+        df = self.file_handler.load_file(filepath)
+        if df is None:
+            raise ValueError(f"failed to load {filepath}")
+        raw_columns = [str(c) for c in df.columns]
+        df = self.processor.clean_data(df)
+        analysis_info = self.processor.analyze_columns(df)
+        self._write_cleaned(filepath, df, append=False)
+        self._write_series(filepath, build_time_series(df, analysis_info))
+
+        return {
+            "version": STATE_VERSION,
+            "source": os.path.abspath(filepath),
+            "byte_offset": size,
+            "prefix_hash": self._prefix_hash(filepath, size),
+            "signature": self._file_signature(filepath),
+            "row_count": int(len(df)),
+            "raw_columns": raw_columns,
+            "columns": [str(c) for c in df.columns],
+            "schema": self._dump_schema(self.processor.build_schema(df)),
+            "analysis_info": analysis_info,
+            "accumulator": FrameAccumulator().update(df).to_dict(),
+            "column_fingerprints": {},
+            "chart_fingerprints": {},
+        }
+
+    def _apply_append(self, filepath, state):
+        with open(filepath, "rb") as f:
+            f.seek(state["byte_offset"])
+            new = pd.read_csv(f, header=None, names=state["raw_columns"])
+        size = os.path.getsize(filepath)
+
+        schema = self._load_schema(state["schema"])
+        cleaned = self.processor.clean_with_schema(new, schema)
+        cleaned = cleaned[[c for c in state["columns"] if c in cleaned.columns]]
+        self._write_cleaned(filepath, cleaned, append=True)
+        series = self._read_series(filepath)
+        for index in series.values():
+            index.update(cleaned)
+        self._write_series(filepath, series)
+
+        acc = FrameAccumulator.from_dict(state["accumulator"]).merge(FrameAccumulator().update(cleaned))
+        state.update({
+            "byte_offset": size,
+            "prefix_hash": self._prefix_hash(filepath, size),
+            "signature": self._file_signature(filepath),
+            "row_count": state["row_count"] + int(len(cleaned)),
+            "schema": self._dump_schema(schema),
+            "accumulator": acc.to_dict(),
+        })
+        for col, info in state["analysis_info"].items():
+            if col in acc.missing:
+                info["missing"] = acc.missing[col]
+            if hasattr(acc.stats.get(col), "distinct"):
+                info["unique"] = acc.stats[col].unique
+        changed = [c for c in state["columns"] if c in cleaned.columns] if len(cleaned) else []
+        return int(len(cleaned)), changed
+
+    # ============================================================
+    #  Charts
+    # ============================================================
+    def _render_changed_charts(self, filepath, state, output_dir):
+        """Render only the suggested charts whose input columns' aggregates changed."""
+        acc = FrameAccumulator.from_dict(state["accumulator"])
+        fingerprints = {col: self._column_fingerprint(acc, col) for col in acc.columns}
+        numeric = [c for c, i in state["analysis_info"].items() if i["kind"] == "numeric"]
+
+        specs = self.analytics.suggest_charts(state["analysis_info"])
+        todo, chart_fps = [], {}
+        for spec in specs:
+            inputs = list(spec["cols"]) + (numeric[:1] if spec["type"] == "line" else [])
+            fp = hashlib.sha1(json.dumps([spec["type"], [fingerprints.get(c) for c in inputs]]).encode()).hexdigest()
+            name = chart_filename(spec)
+            chart_fps[name] = fp
+            if state["chart_fingerprints"].get(name) != fp or not os.path.exists(os.path.join(output_dir, name)):
+                todo.append(spec)
+
+        state["column_fingerprints"] = fingerprints
+        state["chart_fingerprints"] = chart_fps
+        if not todo:
+            return []
+        df = self._read_cleaned(filepath)
+        return self.analytics.generate_and_save_charts(df, state["analysis_info"], output_dir=output_dir, specs=todo,
+                                                       series=self._read_series(filepath))
+
+    def _column_fingerprint(self, acc, col):
+        payload = json.dumps([acc.missing[col], acc.stats[col].to_dict()], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    # ============================================================
+    #  Persistence
+    # ============================================================
+    def _name(self, filepath):
+        return os.path.splitext(os.path.basename(filepath))[0]
+
+    def _base(self, filepath):
+        digest = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"{self._name(filepath)}_{digest}")
+
+    def _load_state(self, filepath):
+        path = self._base(filepath) + ".json"
+        if (not all(os.path.exists(p) for p in (path, self._series_path(filepath)))
+                or not self._cleaned_parts(self._cleaned_path(filepath))):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.log_error("IncrementalProcessor.load_state", str(e))
+            return None
+
+    def _save_state(self, filepath, state):
+        path = self._base(filepath) + ".json"
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, default=str)
+        os.replace(path + ".tmp", path)
+
+    def _cleaned_path(self, filepath):
+        return self._base(filepath) + "_cleaned"
+
+    def _write_cleaned(self, filepath, df, append):
+        """
+        Keep the cleaned history on disk so charts can be re-rendered without
+        re-cleaning: one part file per run (Parquet, pickle if pyarrow can't
+        store the frame), so an append writes only its own rows.
+        """
+        folder = self._cleaned_path(filepath)
+        if not append and os.path.isdir(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder, exist_ok=True)
+        part = os.path.join(folder, f"part-{len(self._cleaned_parts(folder)):05d}")
+        try:
+            df.to_parquet(part + ".tmp", index=False)
+            os.replace(part + ".tmp", part + ".parquet")
+        except Exception:
+            df.reset_index(drop=True).to_pickle(part + ".tmp")
+            os.replace(part + ".tmp", part + ".pkl")
+
+    def _read_cleaned(self, filepath):
+        parts = self._cleaned_parts(self._cleaned_path(filepath))
+        frames = [pd.read_parquet(p) if p.endswith(".parquet") else pd.read_pickle(p) for p in parts]
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    @staticmethod
+    def _cleaned_parts(folder):
+        """Part files in write order."""
+        if not os.path.isdir(folder):
+            return []
+        return sorted(os.path.join(folder, n) for n in os.listdir(folder)
+                      if n.startswith("part-") and n.endswith((".parquet", ".pkl")))
+
+    def _series_path(self, filepath):
+        return self._base(filepath) + ".timeseries.pkl"
+
+    def _write_series(self, filepath, series):
+        """{datetime column: TimeSeriesIndex}; pickled as rollups only, raw rows come from the cleaned data."""
+        path = self._series_path(filepath)
+        pd.to_pickle(series, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def _read_series(self, filepath):
+        return pd.read_pickle(self._series_path(filepath))
+
+    def _dump_schema(self, schema):
+        out = {}
+        for col, (kind, fill) in schema.items():
+            if fill is None or (not isinstance(fill, str) and pd.isna(fill)):
+                fill = None
+            elif kind == "datetime":
+                fill = pd.Timestamp(fill).isoformat()
+            elif kind == "numeric":
+                fill = float(fill)
+            elif kind == "boolean":
+                fill = bool(fill)
+            else:
+                fill = str(fill)
+            out[col] = [kind, fill]
+        return out
+
+    def _load_schema(self, data):
+        return {col: (kind, pd.Timestamp(fill) if kind == "datetime" and fill is not None else fill)
+                for col, (kind, fill) in data.items()}
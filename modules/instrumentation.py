@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import tracemalloc
+from collections import deque
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+ENV_JSONL = "DASHBOARD_METRICS_JSONL"
+ENV_MEMORY = "DASHBOARD_METRICS_MEMORY"
+
+
+class Collector:
+    """
+    Receives finished spans. Always keeps the most recent ones in memory and
+    running per-name totals (for prometheus_text); optionally appends every
+    span as one JSON line to jsonl_path. Settings are mirrored into
+    environment variables so worker processes started later inherit them.
+    """
+
+    def __init__(self, max_records=10_000):
+        self.records = deque(maxlen=max_records)
+        self.totals = {}
+        self.jsonl_path = os.environ.get(ENV_JSONL) or None
+        self.track_memory = os.environ.get(ENV_MEMORY) == "1"
+        self.profile_dir = None
+        self.profile_threshold = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, jsonl_path=None, track_memory=None, profile_dir=None, profile_threshold=None):
+        """
+        jsonl_path: append spans here. track_memory: measure per-span peak
+        Python memory with tracemalloc (slows allocation-heavy code).
+        profile_dir: cProfile top-level spans and dump .prof files for those
+        slower than profile_threshold seconds.
+        """
+        if jsonl_path is not None:
+            self.jsonl_path = jsonl_path or None
+            if self.jsonl_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+                os.environ[ENV_JSONL] = os.path.abspath(self.jsonl_path)
+            else:
+                os.environ.pop(ENV_JSONL, None)
+        if track_memory is not None:
+            self.track_memory = bool(track_memory)
+            os.environ[ENV_MEMORY] = "1" if track_memory else "0"
+        if profile_dir is not None:
+            self.profile_dir = profile_dir or None
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+        if profile_threshold is not None:
+            self.profile_threshold = profile_threshold
+        return self
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            total = self.totals.setdefault(record["name"], {"count": 0, "wall": 0.0, "cpu": 0.0,
+                                                            "rows": 0, "errors": 0, "peak": 0})
+            total["count"] += 1
+            total["wall"] += record["wall_s"]
+            total["cpu"] += record["cpu_s"]
+            total["rows"] += record["rows"] or 0
+            total["errors"] += int(record["error"] is not None)
+            total["peak"] = max(total["peak"], record["peak_bytes"] or 0)
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, default=str) + "\n")
+                except OSError:
+                    pass
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self.totals.clear()
+
+
+collector = Collector()
+configure = collector.configure
+_local = threading.local()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+# ============================================================
+#  Spans
+# ============================================================
+class Span:
+    """
+    Times a block: wall and CPU seconds, rows/sec when `rows` is set (in the
+    constructor or later via span.rows = n), peak traced memory when memory
+    tracking is on, and the process' max RSS. Use as a context manager or
+    through the traced() decorator; spans nest per thread.
+    """
+
+    def __init__(self, name, rows=None, **attrs):
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+        self.record = None
+        self._child_peak = 0
+        self._profiler = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        if collector.profile_dir and self.parent is None:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # another profiler is already active (Python 3.12+)
+                self._profiler = None
+        self._tracing = collector.track_memory
+        if self._tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._mem_start, peak_so_far = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent._child_peak = max(self.parent._child_peak, peak_so_far)
+            tracemalloc.reset_peak()
+        self._started = time.time()
+        self._cpu0 = time.process_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._t0
+        cpu = time.process_time() - self._cpu0
+        peak = None
+        if self._tracing and tracemalloc.is_tracing():
+            # reset_peak() is global, so fold in the peaks children saw before they reset it
+            absolute = max(tracemalloc.get_traced_memory()[1], self._child_peak)
+            peak = max(0, absolute - self._mem_start)
+            if self.parent is not None:
+                self.parent._child_peak = max(self.parent._child_peak, absolute)
+        _stack().pop()
+        if self._profiler is not None:
+            self._profiler.disable()
+            if wall >= collector.profile_threshold:
+                stamp = time.strftime("%Y%m%d_%H%M%S")
+                self._profiler.dump_stats(os.path.join(collector.profile_dir, f"{self.name}_{stamp}_{os.getpid()}.prof"))
+
+        rows = int(self.rows) if self.rows is not None else None
+        self.record = {
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "start": round(self._started, 6),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "rows": rows,
+            "rows_per_s": round(rows / wall, 1) if rows and wall > 0 else None,
+            "peak_bytes": peak,
+            "max_rss_mb": _max_rss_mb(),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "error": exc_type.__name__ if exc_type else None,
+            **({"attrs": self.attrs} if self.attrs else {}),
+        }
+        collector.add(self.record)
+        return False
+
+
+def span(name, rows=None, **attrs):
+    """with span("clean.fill", rows=len(df)) as s: ..."""
+    return Span(name, rows=rows, **attrs)
+
+
+def traced(name, rows=None):
+    """
+    Decorator form of span(). rows, if given, is called as
+    rows(result, *args, **kwargs) to get the number of rows processed.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    try:
+                        s.rows = rows(result, *args, **kwargs)
+                    except Exception:
+                        s.rows = None
+                return result
+        return wrapper
+    return decorate
+
+
+def frame_rows(result, *args, **kwargs):
+    """rows= helper: length of the first DataFrame-like argument (after self)."""
+    for value in list(args) + list(kwargs.values()):
+        if hasattr(value, "columns") and hasattr(value, "__len__"):
+            return len(value)
+    return None
+
+
+# ============================================================
+#  Export
+# ============================================================
+def totals_from_jsonl(path):
+    """Per-span totals rebuilt from a JSONL file (covers spans from every process that wrote to it)."""
+    merged = Collector()
+    merged.jsonl_path = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                merged.add(json.loads(line))
+    return merged.totals
+
+
+def prometheus_text(prefix="dashboard", totals=None):
+    """Per-span totals in the Prometheus text exposition format."""
+    lines = []
+    metrics = [
+        ("span_seconds_total", "counter", "Wall-clock seconds spent in span", "wall"),
+        ("span_cpu_seconds_total", "counter", "CPU seconds spent in span", "cpu"),
+        ("span_calls_total", "counter", "Number of times the span ran", "count"),
+        ("span_rows_total", "counter", "Rows processed in span", "rows"),
+        ("span_errors_total", "counter", "Spans that raised", "errors"),
+        ("span_peak_bytes", "gauge", "Largest traced memory peak seen in span", "peak"),
+    ]
+    if totals is None:
+        with collector._lock:
+            totals = {name: dict(t) for name, t in collector.totals.items()}
+    for metric, kind, help_text, key in metrics:
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, total in sorted(totals.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_{metric}{{span="{label}"}} {total[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix="dashboard", totals=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(prometheus_text(prefix, totals))
+    os.replace(path + ".tmp", path)
+    return path
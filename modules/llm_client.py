@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import socket
+import hashlib
+import threading
+import subprocess
+import http.client
+from modules.logger import AppLogger
+
+DEFAULT_MODEL = "gemma3:4b"
+DEFAULT_HOST = "localhost:11434"
+PROMPT_VERSION = 1  # bump when the suggestion prompt changes
+
+
+class LLMError(RuntimeError):
+    """The model could not produce a response."""
+
+
+class LLMCancelled(LLMError):
+    """The request was cancelled through its cancel_event."""
+
+
+# ============================================================
+#  Transports
+# ============================================================
+class HTTPTransport:
+    """
+    Talks to a running Ollama server over one long-lived HTTP/1.1
+    connection (reopened if the server drops it). Responses are streamed so
+    cancel_event is honoured between tokens. The host comes from
+    OLLAMA_HOST ("host:port" or "http://host:port"), like the ollama CLI.
+    """
+
+    def __init__(self, host=None, timeout=120, keep_alive="10m"):
+        host = host or os.environ.get("OLLAMA_HOST") or DEFAULT_HOST
+        self.host = host.split("://", 1)[-1].rstrip("/")
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def generate(self, model, prompt, cancel_event=None):
+        body = json.dumps({"model": model, "prompt": prompt, "stream": True, "keep_alive": self.keep_alive})
+        with self._lock:
+            try:
+                return self._generate(body, cancel_event)
+            except BaseException:
+                # an error mid-request leaves an unread response on the connection: never reuse it
+                self.close()
+                raise
+
+    def _generate(self, body, cancel_event):
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", "/api/generate", body=body, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()  # stale keep-alive connection: retry once on a fresh one
+                if attempt:
+                    raise
+            except socket.timeout:
+                raise LLMError(f"Ollama model timed out (no response within {self.timeout} seconds).")
+        if response.status != 200:
+            detail = response.read().decode("utf-8", "ignore")
+            raise LLMError(f"Ollama server returned {response.status}: {detail[:200]}")
+        parts = []
+        try:
+            for line in response:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LLMCancelled("Ollama request cancelled.")
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise LLMError(message["error"])
+                parts.append(message.get("response", ""))
+                if message.get("done"):
+                    break
+            response.read()  # drain so the connection can be reused
+        except socket.timeout:
+            raise LLMError(f"Ollama model timed out (no response within {self.timeout} seconds).")
+        return "".join(parts).strip()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, timeout=self.timeout)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SubprocessTransport:
+    """Fallback: one `ollama run` process per request (cold model load each time)."""
+
+    def __init__(self, timeout=120):
+        self.timeout = timeout
+
+    def generate(self, model, prompt, cancel_event=None):
+        proc = subprocess.Popen(
+            ["ollama", "run", model, prompt],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="ignore",
+        )
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                stdout, _ = proc.communicate(timeout=0.5)
+                return stdout.strip()
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    raise LLMCancelled("Ollama request cancelled.")
+                if time.monotonic() > deadline:
+                    proc.kill()
+                    proc.communicate()
+                    raise LLMError(f"Ollama model timed out (no response within {self.timeout} seconds).")
+
+
+class StubTransport:
+    """Offline stand-in: returns a fixed reply (or reply(model, prompt)) and records calls."""
+
+    def __init__(self, reply=""):
+        self.reply = reply
+        self.calls = []
+
+    def generate(self, model, prompt, cancel_event=None):
+        self.calls.append((model, prompt))
+        return self.reply(model, prompt) if callable(self.reply) else self.reply
+
+
+# ============================================================
+#  Client
+# ============================================================
+class OllamaClient:
+    """
+    Local model client. Uses `transport` (HTTP by default) and falls back
+    to `fallback` (the ollama CLI) when the server cannot be reached.
+    Pass a StubTransport (and fallback=None) to run without a model.
+    """
+
+    def __init__(self, transport=None, fallback="default", timeout=120):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.transport = transport or HTTPTransport(timeout=timeout)
+        self.fallback = SubprocessTransport(timeout=timeout) if fallback == "default" else fallback
+
+    def generate(self, prompt, model=DEFAULT_MODEL, cancel_event=None):
+        """Return the model's text response; raises LLMError on failure."""
+        try:
+            text = self.transport.generate(model, prompt, cancel_event=cancel_event)
+        except (ConnectionRefusedError, socket.gaierror) as e:
+            if self.fallback is None:
+                raise LLMError(f"Ollama server unreachable: {e}")
+            self.logger.log_info("OllamaClient.generate", f"Server unreachable ({e}); using ollama CLI.")
+            try:
+                text = self.fallback.generate(model, prompt, cancel_event=cancel_event)
+            except FileNotFoundError:
+                raise LLMError("Ollama is not installed or not running.")
+        if not text:
+            raise LLMError("No response received from the local model.")
+        return text
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """Process-wide client, so every window shares one server connection."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
+
+
+# ============================================================
+#  Suggestion cache
+# ============================================================
+class SuggestionCache:
+    """
+    On-disk cache of model responses keyed on the dataset's schema, a
+    fingerprint of the summary sent in the prompt, and the model name.
+    Entries expire after ttl seconds; beyond max_entries the least recently
+    used are removed.
+    """
+
+    def __init__(self, cache_dir="cache/llm", ttl=7 * 24 * 3600, max_entries=500):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, df, summary, model):
+        schema = [[str(c), str(t)] for c, t in df.dtypes.items()]
+        meta = {
+            "schema": schema,
+            "rows": int(len(df)),
+            "summary": hashlib.sha1(summary.encode("utf-8")).hexdigest(),
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+        }
+        return hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        path = os.path.join(self.cache_dir, key + ".json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created"] > self.ttl:
+                os.remove(path)
+                return None
+            os.utime(path)  # mark as recently used
+            return entry["response"]
+        except Exception as e:
+            self.logger.log_error("SuggestionCache.get", f"{path} | {e}")
+            return None
+
+    def put(self, key, response, model=None):
+        path = os.path.join(self.cache_dir, key + ".json")
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "model": model, "response": response}, f)
+            os.replace(path + ".tmp", path)
+            self.evict()
+        except Exception as e:
+            self.logger.log_error("SuggestionCache.put", str(e))
+
+    def evict(self):
+        entries = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
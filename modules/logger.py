@@ -1,5 +1,150 @@
 import os
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
+from multiprocessing import parent_process
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+
+class _LogWriter:
+    """
+    Background writer for one log file. Entries are queued by any thread and
+    appended in batches (every batch_size entries or flush_interval seconds,
+    errors flush right away). Writes and rotation happen under an OS file
+    lock so several processes can share the same log.
+    With background=False (pool worker processes, which exit through
+    os._exit and never run atexit) every entry is written synchronously.
+    """
+
+    def __init__(self, log_file, batch_size=200, flush_interval=1.0,
+                 max_bytes=5 * 1024 * 1024, backup_count=3, background=True):
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.pid = os.getpid()
+        self.background = background
+        self._write_lock = threading.Lock()
+        self._queue = queue.Queue()
+        if background:
+            self._thread = threading.Thread(target=self._run, name="AppLoggerWriter", daemon=True)
+            self._thread.start()
+
+    def put(self, entry, urgent=False):
+        if not self.background:
+            with self._write_lock:
+                self._write_batch([entry])
+            return
+        self._queue.put((entry, urgent))
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far is on disk."""
+        if not self.background:
+            return
+        done = threading.Event()
+        self._queue.put((done, True))
+        done.wait(timeout)
+
+    def _run(self):
+        batch, waiters = [], []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item, urgent = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                urgent = True
+            if urgent or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write_batch(batch)
+                    batch = []
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write_batch(self, lines):
+        data = "".join(lines)
+        try:
+            with open(self.log_file + ".lock", "a+b") as lock:
+                self._lock(lock)
+                try:
+                    self._rotate_if_needed(len(data.encode("utf-8")))
+                    with open(self.log_file, "a", encoding="utf-8") as f:
+                        f.write(data)
+                finally:
+                    self._unlock(lock)
+        except Exception:
+            pass  # logging must never take the app down
+
+    def _rotate_if_needed(self, incoming):
+        if not self.max_bytes or not os.path.exists(self.log_file):
+            return
+        if os.path.getsize(self.log_file) + incoming <= self.max_bytes:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src, dst = f"{self.log_file}.{i}", f"{self.log_file}.{i + 1}"
+            if os.path.exists(src):
+                os.replace(src, dst)
+        if self.backup_count > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            open(self.log_file, "w").close()
+
+    def _lock(self, f):
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(self, f):
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        elif msvcrt:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(log_file):
+    """Return this process's shared writer for log_file (recreated after fork)."""
+    key = os.path.abspath(log_file)
+    writer = _writers.get(key)
+    if writer is None or writer.pid != os.getpid():
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None or writer.pid != os.getpid():
+                # only the main process can count on atexit to flush a queue
+                writer = _LogWriter(log_file, background=parent_process() is None)
+                _writers[key] = writer
+    return writer
+
+
+def flush_all():
+    for writer in list(_writers.values()):
+        if writer.pid == os.getpid():
+            writer.flush()
+
+
+atexit.register(flush_all)
 
 
 class AppLogger:
@@ -11,11 +156,13 @@ class AppLogger:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         entry = f"[{timestamp}] [{level}] [{source}] {message}\n"
 
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(entry)
+        _get_writer(self.log_file).put(entry, urgent=(level == "ERROR"))
 
     def log_info(self, source, message):
         self._write_log("INFO", source, message)
 
     def log_error(self, source, message):
         self._write_log("ERROR", source, message)
+
+    def flush(self):
+        _get_writer(self.log_file).flush()
@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import time
+from modules.file_handler import FileHandler
+from modules.data_processor import DataProcessor
+from modules.analytics_engine import AnalyticsEngine
+from modules.report_generator import ReportGenerator
+from modules.logger import AppLogger
+
+SLUG_PATTERN = r"[^\w.-]+"  # characters replaced in folder names built from sheet labels
+
+
+# ============================================================
+#  Headless pipeline: load → clean → analyze → charts → report
+# ============================================================
+def run_pipeline(filepath, output_root="output/batch", chart_workers=None, chart_cache_dir=None, name=None):
+    """
+    Run the full dashboard flow for one file without any GUI.
+    chart_cache_dir enables the ChartCache there (identical charts are linked, not re-rendered).
+    name is the output folder under output_root (default: the file name
+    without its extension; cli.output_names keeps batch names unique).
+    A workbook whose sheets have several column layouts is processed once
+    per layout: the largest group into output_dir, every other group into
+    <output_dir>_<sheets>, each listed under "sheet_groups".
+    Returns a JSON-serialisable manifest entry describing the outputs.
+    """
+    logger = AppLogger("logs/error_log.txt")
+    name = name or os.path.splitext(os.path.basename(filepath))[0]
+    output_dir = os.path.join(output_root, name)
+    entry = {"input": filepath, "output_dir": output_dir, "status": "ok", "timings": {}}
+    started = time.perf_counter()
+
+    try:
+        handler = FileHandler()
+        df = _stage(entry, "load", handler.load_file, filepath)
+        if df is None:
+            raise ValueError("failed to load file")
+        chart_cache = None
+        if chart_cache_dir:
+            from modules.chart_cache import ChartCache
+            chart_cache = ChartCache(chart_cache_dir)
+        _process_frame(df, entry, output_dir, chart_workers, chart_cache)
+
+        groups = handler.last_sheet_groups
+        if len(groups) > 1:
+            entry["sheet_groups"] = []
+            for label, group in groups.items():
+                if group is df:
+                    entry["sheets"] = label
+                    continue
+                sub = {"sheets": label, "output_dir": f"{output_dir}_{re.sub(SLUG_PATTERN, '_', label)}",
+                       "status": "ok", "timings": {}}
+                try:
+                    _process_frame(group, sub, sub["output_dir"], chart_workers, chart_cache)
+                except Exception as e:
+                    sub["status"] = "error"
+                    sub["error"] = str(e)
+                    logger.log_error("pipeline.run_pipeline", f"{filepath} [{label}] | {e}")
+                entry["sheet_groups"].append(sub)
+            failed = [g["sheets"] for g in entry["sheet_groups"] if g["status"] != "ok"]
+            if failed:
+                entry["status"] = "error"
+                entry["error"] = f"sheet groups failed: {failed}"
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+        logger.log_error("pipeline.run_pipeline", f"{filepath} | {e}")
+
+    entry["duration"] = round(time.perf_counter() - started, 4)
+    logger.log_info("pipeline.run_pipeline", f"{filepath} → {entry['status']} in {entry['duration']}s")
+    return entry
+
+
+def _stage(entry, label, func, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    entry["timings"][label] = round(time.perf_counter() - t0, 4)
+    return result
+
+
+def _process_frame(df, entry, output_dir, chart_workers=None, chart_cache=None):
+    """clean → analyze → charts → report for one loaded frame, recorded in entry."""
+    os.makedirs(output_dir, exist_ok=True)
+    entry["rows"], entry["columns"] = int(len(df)), int(len(df.columns))
+
+    processor = DataProcessor()
+    df = _stage(entry, "clean", processor.clean_data, df, compact=True)
+    if processor.last_memory_report:
+        entry["memory_bytes"] = {k: processor.last_memory_report[k] for k in ("bytes_before", "bytes_after")}
+    analysis_info = _stage(entry, "analyze", processor.analyze_columns, df)
+    entry["column_kinds"] = {col: info["kind"] for col, info in analysis_info.items()}
+
+    analytics = AnalyticsEngine(chart_cache=chart_cache)
+    entry["charts"] = _stage(entry, "charts", analytics.generate_and_save_charts, df, analysis_info,
+                             workers=chart_workers, output_dir=os.path.join(output_dir, "charts"))
+    entry["report"] = _stage(entry, "report", ReportGenerator(output_dir).write_numeric_report, df)
+
+
+def run_incremental(filepath, output_root="output/batch", name=None):
+    """Like run_pipeline, but only processes rows appended since the last run."""
+    from modules.incremental import IncrementalProcessor
+
+    logger = AppLogger("logs/error_log.txt")
+    name = name or os.path.splitext(os.path.basename(filepath))[0]
+    output_dir = os.path.join(output_root, name)
+    entry = {"input": filepath, "output_dir": output_dir, "status": "ok"}
+    started = time.perf_counter()
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        result = IncrementalProcessor().update(filepath, output_dir=os.path.join(output_dir, "charts"))
+        report_path = os.path.join(output_dir, "numeric_report.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(result["report"], f, indent=4)
+        entry.update({"mode": result["mode"], "new_rows": result["new_rows"], "rows": result["total_rows"],
+                      "charts": result["charts"], "report": report_path})
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+        logger.log_error("pipeline.run_incremental", f"{filepath} | {e}")
+    entry["duration"] = round(time.perf_counter() - started, 4)
+    return entry
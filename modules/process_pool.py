@@ -0,0 +1,11 @@
+import multiprocessing
+
+
+def pool_context():
+    """
+    Start method for ProcessPoolExecutor: forkserver (spawn where it is
+    unavailable). Forking a process that has other threads running (Tk task
+    runners, the log writer) can deadlock the child on a lock held mid-fork.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
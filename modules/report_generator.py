@@ -1,6 +1,7 @@
 import os
 import json
 from datetime import datetime
+from modules.accumulators import FrameAccumulator
 
 class ReportGenerator:
     def __init__(self, output_dir="output"):
@@ -33,3 +34,57 @@ class ReportGenerator:
         except Exception as e:
             print(f"❌ Report generation failed: {e}")
             return None
+
+    def numeric_summary(self, df):
+        """
+        Return {column: stats} for the numeric columns of df (empty if none).
+        df may also be a FrameAccumulator (chunked or incremental runs): the
+        stats then come from its running moments without touching the rows,
+        with the median estimated by its quantile sketch.
+        """
+        if isinstance(df, FrameAccumulator):
+            return self._accumulator_summary(df)
+        numeric_df = df.select_dtypes(include="number")
+        if numeric_df.empty:
+            return {}
+        # Exact stats over the whole numeric block (agg still scans it once per statistic)
+        stats = numeric_df.agg(["mean", "median", "min", "max", "std"])
+        missing = numeric_df.isna().sum()
+        summary = {}
+        for col in numeric_df.columns:
+            summary[col] = {
+                "mean": float(stats.at["mean", col]),
+                "median": float(stats.at["median", col]),
+                "min": float(stats.at["min", col]),
+                "max": float(stats.at["max", col]),
+                "std_dev": float(stats.at["std", col]),
+                "missing_values": int(missing[col])
+            }
+        return summary
+
+    def _accumulator_summary(self, acc):
+        summary = {}
+        for col in acc.columns:
+            stats = acc.stats[col]
+            if not hasattr(stats, "m2"):
+                continue  # CategoryAccumulator
+            empty = stats.count == 0
+            summary[col] = {
+                "mean": float("nan") if empty else float(stats.mean),
+                "median": float(stats.quantiles.quantile(0.5)),
+                "min": float("nan") if empty else float(stats.min),
+                "max": float("nan") if empty else float(stats.max),
+                "std_dev": float(stats.std),
+                "missing_values": int(acc.missing[col])
+            }
+        return summary
+
+    def write_numeric_report(self, df, filename="numeric_report.json"):
+        """Write numeric_summary(df) as JSON; returns the path, or None if df has no numeric columns."""
+        summary = self.numeric_summary(df)
+        if not summary:
+            return None
+        report_path = os.path.join(self.output_dir, filename)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+        return report_path
@@ -0,0 +1,200 @@
+import math
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+#  KLL quantile sketch
+# ============================================================
+class QuantileSketch:
+    """
+    KLL quantile sketch. Memory stays around 3*k values however many are
+    added; estimated quantiles are within about ±1.7/k in rank (≈0.85% of n
+    for k=200) with high probability. Sketches merge by concatenating
+    levels and re-compacting, so chunk/worker partials combine freely.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values):
+        arr = np.asarray(pd.to_numeric(pd.Series(values), errors="coerce").dropna(), dtype=float)
+        if arr.size:
+            self.n += int(arr.size)
+            self.levels[0] = np.concatenate([self.levels[0], arr])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self._capacity(h):
+                items = np.sort(items)
+                keep = items[-1:] if items.size % 2 else items[:0]
+                pairs = items[:items.size - keep.size]
+                promoted = pairs[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                h = 0  # capacities depend on the number of levels
+                continue
+            h += 1
+
+    def quantiles(self, qs):
+        """Return estimated values for each q in qs (NaN when empty)."""
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="mergesort")
+        values, cum = values[order], np.cumsum(weights[order])
+        total = cum[-1]
+        out = []
+        for q in qs:
+            idx = int(np.searchsorted(cum, q * total, side="left"))
+            out.append(float(values[min(idx, values.size - 1)]))
+        return out
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in data["levels"]] or [np.empty(0)]
+        return sketch
+
+
+# ============================================================
+#  HyperLogLog distinct counter
+# ============================================================
+class DistinctSketch:
+    """
+    HyperLogLog with 2**p registers (p=14: 16 KB, standard error ≈0.8%).
+    Merging takes the register-wise max, which is exact: merged sketches
+    equal a sketch built over the union of the inputs.
+    """
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, series):
+        values = pd.Series(series).dropna()
+        if values.empty:
+            return self
+        hashes = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy(dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes << np.uint64(self.p)
+        rank = np.minimum(65 - self._bit_length(rest), 65 - self.p).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    @staticmethod
+    def _bit_length(x):
+        """Vectorised int.bit_length for uint64 arrays."""
+        bits = np.frexp(x.astype(np.float64))[1].astype(np.int64)
+        bits = np.minimum(bits, 64)
+        over = bits > 0
+        shifted = np.zeros_like(x)
+        shifted[over] = np.uint64(1) << (bits[over] - 1).astype(np.uint64)
+        bits[over & (shifted > x)] -= 1
+        return bits
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {"p": self.p, "registers": self.registers.tobytes().hex()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(p=data["p"])
+        sketch.registers = np.frombuffer(bytes.fromhex(data["registers"]), dtype=np.uint8).copy()
+        return sketch
+
+
+# ============================================================
+#  Misra–Gries / space-saving heavy hitters
+# ============================================================
+class TopKSketch:
+    """
+    Frequent-items summary keeping at most `capacity` counters. Reported
+    counts underestimate the truth by at most n/(capacity+1); any value with
+    frequency above that bound is guaranteed to be present. Merging adds the
+    counters and trims back to capacity, keeping the same bound.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+
+    def update(self, series):
+        counts = pd.Series(series).dropna().astype(str).value_counts()
+        self.n += int(counts.sum())
+        return self._absorb(counts)
+
+    def merge(self, other):
+        self.n += other.n
+        return self._absorb(pd.Series(other.counts, dtype="int64"))
+
+    def _absorb(self, counts):
+        if self.counts:
+            counts = counts.add(pd.Series(self.counts, dtype="int64"), fill_value=0)
+        counts = counts.sort_values(ascending=False)
+        if len(counts) > self.capacity:
+            cut = counts.iloc[self.capacity]
+            counts = counts.iloc[:self.capacity] - cut
+            counts = counts[counts > 0]
+        self.counts = {k: int(v) for k, v in counts.items()}
+        return self
+
+    @property
+    def error_bound(self):
+        return self.n // (self.capacity + 1)
+
+    def top(self, n=10):
+        return sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "n": self.n, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(capacity=data["capacity"])
+        sketch.n = data["n"]
+        sketch.counts = dict(data["counts"])
+        return sketch
@@ -0,0 +1,112 @@
+import re
+from modules.logger import AppLogger
+
+# Words the model uses for each chart type → spec "type"
+CHART_ALIASES = {
+    "hist": "hist", "histogram": "hist", "distribution": "hist",
+    "box": "box", "boxplot": "box", "box plot": "box", "box and whisker": "box",
+    "bar": "bar", "bar chart": "bar", "bar plot": "bar", "column": "bar", "count": "bar", "countplot": "bar",
+    "scatter": "scatter", "scatter plot": "scatter", "scatterplot": "scatter",
+    "line": "line", "line chart": "line", "line plot": "line", "time series": "line", "trend": "line",
+    "pie": "pie", "pie chart": "pie",
+}
+NO_COLUMN = {"", "none", "null", "n/a", "na", "-", "nan", "count"}
+BAR_TOP_THRESHOLD = 15  # same cut-off suggest_charts uses for bar vs bar_top
+
+
+class SuggestionParser:
+    """
+    Turn the model's `<chart_type> | <x_column> | <y_column or None> | <reason>`
+    lines into the spec dicts used by AnalyticsEngine and Visualizer, keeping
+    only charts that make sense for the columns in analysis_info. Lines that
+    do not fit are collected in self.rejected as (line, why).
+    """
+
+    def __init__(self, analysis_info):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.analysis_info = analysis_info
+        self.columns = {self._norm(c): c for c in analysis_info}
+        self.rejected = []
+
+    def parse(self, text):
+        """Return a list of valid, de-duplicated specs from the model's text."""
+        self.rejected = []
+        specs, seen = [], set()
+        for raw in (text or "").splitlines():
+            line = raw.strip()
+            if line.count("|") < 2 or set(line) <= set("|-: "):
+                continue
+            parts = [self._clean(p) for p in line.strip("|").split("|")]
+            try:
+                spec = self._to_spec(parts[0], parts[1], parts[2], " | ".join(parts[3:]))
+            except ValueError as e:
+                self.rejected.append((line, str(e)))
+                continue
+            key = (spec["type"], tuple(spec["cols"]))
+            if key not in seen:
+                seen.add(key)
+                specs.append(spec)
+        self.logger.log_info("SuggestionParser.parse", f"{len(specs)} specs accepted, {len(self.rejected)} rejected")
+        return specs
+
+    # ============================================================
+    #  Validation
+    # ============================================================
+    def _to_spec(self, chart, x, y, reason):
+        kind = CHART_ALIASES.get(re.sub(r"\s+", " ", chart.lower()).replace("-", " "))
+        if kind is None:
+            raise ValueError(f"unknown chart type '{chart}'")
+        x = self._column(x)
+        y = self._column(y) if self._norm(y) not in NO_COLUMN else None
+        if x is None:
+            raise ValueError("x column not found")
+        reason = f"LLM: {reason}" if reason else "LLM suggestion"
+
+        if kind in ("hist", "box"):
+            if y is not None and kind == "box" and self._kind(x) == "categorical" and self._kind(y) == "numeric":
+                return {"type": "box_group", "cols": [y, x], "reason": reason}
+            col = x if self._kind(x) == "numeric" else y
+            if col is None or self._kind(col) != "numeric":
+                raise ValueError(f"{kind} needs a numeric column")
+            return {"type": kind, "cols": [col], "reason": reason}
+
+        if kind == "scatter":
+            if y is None or x == y or self._kind(x) != "numeric" or self._kind(y) != "numeric":
+                raise ValueError("scatter needs two different numeric columns")
+            return {"type": "scatter", "cols": [x, y], "reason": reason}
+
+        if kind == "line":
+            if self._kind(x) != "datetime" and y is not None and self._kind(y) == "datetime":
+                x, y = y, x
+            if self._kind(x) != "datetime":
+                raise ValueError("line needs a datetime x column")
+            if y is not None and self._kind(y) != "numeric":
+                raise ValueError("line y column must be numeric")
+            return {"type": "line", "cols": [x] + ([y] if y else []), "reason": reason}
+
+        # bar / pie: a categorical axis, optionally a numeric value to sum
+        if self._kind(x) != "categorical" and y is not None and self._kind(y) == "categorical":
+            x, y = y, x
+        if self._kind(x) != "categorical":
+            raise ValueError(f"{kind} needs a categorical x column")
+        if y is not None and self._kind(y) != "numeric":
+            raise ValueError(f"{kind} y column must be numeric")
+        if kind == "bar" and self.analysis_info[x].get("unique", 0) > BAR_TOP_THRESHOLD:
+            kind = "bar_top"
+        return {"type": kind, "cols": [x] + ([y] if y else []), "reason": reason}
+
+    # ============================================================
+    #  Helpers
+    # ============================================================
+    def _clean(self, part):
+        part = part.strip().strip("*`'\"<>[]() ").strip()
+        return re.sub(r"^(\d+[.)]|[-•])\s*", "", part).strip("*`'\" ")
+
+    def _norm(self, name):
+        return str(name).strip().lower()
+
+    def _column(self, name):
+        return self.columns.get(self._norm(name))
+
+    def _kind(self, col):
+        return self.analysis_info[col]["kind"]
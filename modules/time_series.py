@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from modules.logger import AppLogger
+from modules.instrumentation import span
+
+ROLLUPS = ("D", "W", "M")
+_MONTH_OFFSETS = ("MonthEnd", "MonthBegin", "QuarterEnd", "QuarterBegin", "YearEnd", "YearBegin")
+
+
+def _rule(freq):
+    """Pandas resample rule for freq ("M" means month end on every pandas version)."""
+    if freq == "M":
+        try:
+            to_offset("ME")
+            return "ME"
+        except ValueError:  # pandas < 2.2
+            return "M"
+    return freq
+
+
+class TimeSeriesIndex:
+    """
+    One datetime column sorted once, with day/week/month rollups (row count
+    and per-numeric-column sum, count, min, max) computed up front.
+
+    series() serves any granularity: cached rollups directly, coarser
+    month-based rules (quarter, year, ...) from the month rollup, other
+    rules of a day or more from the day rollup, and finer rules from the
+    raw rows (then cached). The statistics are mergeable, so update() folds
+    newly arrived rows into every cached rollup instead of rebuilding them.
+    """
+
+    def __init__(self, column, rollups=ROLLUPS):
+        self.logger = AppLogger("logs/error_log.txt")
+        self.column = column
+        self.rollup_freqs = rollups
+        self.numeric = []
+        self.rows = 0
+        self._rollups = {}
+        self._frames = []
+        self._times = np.empty(0, dtype="datetime64[ns]")
+        self._order = np.empty(0, dtype=np.int64)
+        self._raw_complete = True  # False once pickled: the raw rows stay behind
+
+    def build(self, df, numeric=None):
+        with span("timeseries.build", rows=len(df), column=str(self.column)):
+            if numeric is None:
+                numeric = [c for c in df.select_dtypes(include="number").columns
+                           if not pd.api.types.is_bool_dtype(df[c])]
+            self.numeric = [c for c in numeric if c != self.column]
+            self._rollups = {}
+            self._frames, self._times, self._order = [], self._times[:0], self._order[:0]
+            self._raw_complete = True
+            self._append(df)
+            daily = self._aggregate(df, "D", order=self._order)
+            self._rollups["D"] = daily
+            for freq in self.rollup_freqs:
+                if freq != "D":
+                    self._rollups[freq] = self._resample(daily, _rule(freq))
+        return self
+
+    def update(self, new_df):
+        """Merge rows that arrived after build() into the sorted index and every cached rollup."""
+        try:
+            with span("timeseries.update", rows=len(new_df), column=str(self.column)):
+                self._append(new_df)
+                daily = self._aggregate(new_df, "D")
+                for freq, rollup in list(self._rollups.items()):
+                    if freq == "D":
+                        part = daily
+                    elif self._base(freq) is not None:
+                        part = self._resample(daily, _rule(freq))
+                    else:
+                        part = self._aggregate(new_df, _rule(freq))
+                    self._rollups[freq] = self._merge(rollup, part)
+        except Exception as e:
+            self.logger.log_error("TimeSeriesIndex.update", str(e))
+        return self
+
+    # ============================================================
+    #  Queries
+    # ============================================================
+    def rollup(self, freq="M"):
+        """{rows, sum, count, min, max} for freq, from the nearest cached rollup."""
+        if freq not in self._rollups:
+            base = self._base(freq)
+            if base is not None:
+                self._rollups[freq] = self._resample(self.rollup(base), _rule(freq))
+            else:
+                frames = [self._aggregate(f, _rule(freq)) for f in self._frames] if self._raw_complete else []
+                if not frames:
+                    raise ValueError(f"raw rows for {freq!r} are not available")
+                merged = frames[0]
+                for part in frames[1:]:
+                    merged = self._merge(merged, part)
+                self._rollups[freq] = merged
+        return self._rollups[freq]
+
+    def series(self, column=None, freq="M", how="mean"):
+        """column aggregated per freq bucket (how: mean, sum, count, min, max); row counts if column is None."""
+        rollup = self.rollup(freq)
+        if column is None:
+            return rollup["rows"].rename("rows")
+        if how == "mean":
+            counts = rollup["count"][column]
+            return (rollup["sum"][column] / counts.where(counts > 0)).rename(column)
+        return rollup[how][column].rename(column)
+
+    def buckets(self, freq):
+        return len(self.rollup(freq)["rows"])
+
+    def raw(self, column, df=None):
+        """
+        column's raw values sorted by time (NaT rows dropped). When the index
+        no longer holds its rows (it was pickled, e.g. into a process pool or
+        to disk) they are read from df, the frame it indexes; None without one.
+        """
+        if column not in self.numeric:
+            return None
+        if self._raw_complete and self._frames:
+            values = np.concatenate([f[column].to_numpy(dtype=float, na_value=np.nan) for f in self._frames])
+            times, order = self._times, self._order
+        elif df is not None:
+            times = pd.to_datetime(df[self.column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            values = df[column].to_numpy(dtype=float, na_value=np.nan)
+            order = self._sorted(times)
+        else:
+            return None
+        return pd.Series(values[order], index=pd.DatetimeIndex(times[order], name=self.column), name=column)
+
+    # ============================================================
+    #  Internals
+    # ============================================================
+    def _base(self, freq):
+        """Cached rollup that freq can be built from exactly, or None for sub-daily rules."""
+        offset = to_offset(_rule(freq))
+        if type(offset).__name__ in _MONTH_OFFSETS:
+            return "M" if "M" in self._rollups else "D"
+        if isinstance(offset, pd.offsets.Week):
+            return "D"
+        if isinstance(offset, pd.offsets.Tick) and offset.nanos % pd.Timedelta(days=1).value == 0:
+            return "D"
+        return None
+
+    def _append(self, df):
+        times = pd.to_datetime(df[self.column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        if not self._raw_complete:  # unpickled: keep counting, but a partial raw index would be wrong
+            self.rows += int((~np.isnat(times)).sum())
+            return
+        self._frames.append(df)
+        self._times = np.concatenate([self._times, times])
+        self._order = self._sorted(self._times)
+        self.rows = int(len(self._order))
+
+    @staticmethod
+    def _sorted(times):
+        """Positions of the non-NaT times in time order."""
+        valid = np.flatnonzero(~np.isnat(times))
+        # stable sort of nearly sorted int64 keys (appended rows usually come last) is a radix pass
+        return valid[np.argsort(times[valid], kind="stable")]
+
+    def _aggregate(self, df, rule, order=None):
+        """Rollup of df's rows; order (sorted positions of the non-NaT rows) saves resample a sort."""
+        times = pd.to_datetime(df[self.column], errors="coerce")
+        frame = df[self.numeric].apply(pd.to_numeric, errors="coerce") if self.numeric else df[[]]
+        frame = frame.set_axis(pd.DatetimeIndex(times, name=self.column), axis=0)
+        frame = frame.take(order) if order is not None else frame[frame.index.notna()]
+        resampler = frame.resample(rule)
+        return {
+            "rows": resampler.size(),
+            "sum": resampler.sum(),
+            "count": resampler.count(),
+            "min": resampler.min(),
+            "max": resampler.max(),
+        }
+
+    @staticmethod
+    def _resample(rollup, rule):
+        return {
+            "rows": rollup["rows"].resample(rule).sum(),
+            "sum": rollup["sum"].resample(rule).sum(),
+            "count": rollup["count"].resample(rule).sum(),
+            "min": rollup["min"].resample(rule).min(),
+            "max": rollup["max"].resample(rule).max(),
+        }
+
+    @staticmethod
+    def _merge(old, new):
+        merged = {}
+        for stat in ("rows", "sum", "count"):
+            merged[stat] = old[stat].add(new[stat], fill_value=0)
+        merged["min"] = pd.concat([old["min"], new["min"]]).groupby(level=0).min()
+        merged["max"] = pd.concat([old["max"], new["max"]]).groupby(level=0).max()
+        if isinstance(merged["count"], pd.DataFrame):
+            merged["count"] = merged["count"].astype("int64")
+        merged["rows"] = merged["rows"].astype("int64")
+        return merged
+
+    def __getstate__(self):
+        # Rollups only: process-pool renderers already get the frame, and saved
+        # indexes should not duplicate it; raw() then reads from the frame passed in.
+        state = dict(self.__dict__)
+        state["_frames"] = []
+        state["_times"] = self._times[:0]
+        state["_order"] = self._order[:0]
+        state["_raw_complete"] = False
+        return state
+
+
+def build_time_series(df, analysis_info=None):
+    """TimeSeriesIndex per datetime column of df (kinds from analysis_info when given)."""
+    if analysis_info:
+        columns = [c for c, i in analysis_info.items() if i["kind"] == "datetime" and c in df.columns]
+        numeric = [c for c, i in analysis_info.items() if i["kind"] == "numeric" and c in df.columns
+                   and not pd.api.types.is_bool_dtype(df[c])]
+    else:
+        columns = list(df.select_dtypes(include="datetime").columns)
+        numeric = None
+    return {col: TimeSeriesIndex(col).build(df, numeric) for col in columns}
@@ -0,0 +1,122 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+NUMERIC_PATTERN = r"^-?\d+(\.\d+)?$"
+TRUE_VALUES = {"true", "yes", "y", "t"}
+FALSE_VALUES = {"false", "no", "n", "f"}
+
+
+class TypeInferencer:
+    """
+    Decide each column's kind (numeric, datetime, boolean, categorical) from
+    a single bounded sample, then convert only the columns that need it.
+    Columns that already have a numeric/bool/datetime dtype are never rescanned.
+    """
+
+    def __init__(self, sample_size=1000, threshold=0.6, workers=None):
+        self.sample_size = sample_size
+        self.threshold = threshold
+        self.workers = workers  # >1 runs columns in a thread pool
+
+    # ============================================================
+    #  Inference
+    # ============================================================
+    def infer(self, df):
+        """Return {col: decision} where decision has kind, action and ratio."""
+        cols = list(df.columns)
+        results = self._map(lambda c: self._infer_column(df[c]), cols)
+        return dict(zip(cols, results))
+
+    def _infer_column(self, series):
+        dtype = str(series.dtype)
+        if pd.api.types.is_bool_dtype(series):
+            return {"kind": "boolean", "dtype": dtype, "action": None, "ratio": 1.0}
+        if pd.api.types.is_numeric_dtype(series):
+            return {"kind": "numeric", "dtype": dtype, "action": None, "ratio": 1.0}
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return {"kind": "datetime", "dtype": dtype, "action": None, "ratio": 1.0}
+
+        sample = self._sample(series)
+        if sample.empty:
+            return {"kind": "categorical", "dtype": dtype, "action": None, "ratio": 0.0}
+        text = sample.astype(str)
+
+        ratio = float(text.str.match(NUMERIC_PATTERN).mean())
+        if ratio > self.threshold:
+            return {"kind": "numeric", "dtype": dtype, "action": "to_numeric", "ratio": ratio}
+
+        lowered = text.str.strip().str.lower()
+        ratio = float(lowered.isin(TRUE_VALUES | FALSE_VALUES).mean())
+        if ratio == 1.0:
+            return {"kind": "boolean", "dtype": dtype, "action": "to_boolean", "ratio": ratio}
+
+        fmt = self._guess_format(text)
+        ratio = self._datetime_ratio(text, fmt)
+        if fmt and ratio <= self.threshold:
+            fmt = None
+            ratio = self._datetime_ratio(text, fmt)
+        if ratio > self.threshold:
+            return {"kind": "datetime", "dtype": dtype, "action": "to_datetime", "ratio": ratio, "format": fmt}
+
+        return {"kind": "categorical", "dtype": dtype, "action": None, "ratio": 0.0}
+
+    def _sample(self, series):
+        """Evenly spaced sample of non-null values (deterministic)."""
+        values = series.dropna()
+        if len(values) <= self.sample_size:
+            return values
+        idx = np.linspace(0, len(values) - 1, self.sample_size).astype(int)
+        return values.iloc[idx]
+
+    def _guess_format(self, text):
+        """Return a strftime format shared by the sample, if pandas can guess one."""
+        try:
+            from pandas.tseries.api import guess_datetime_format
+        except ImportError:
+            return None
+        return guess_datetime_format(text.iloc[0])
+
+    def _datetime_ratio(self, text, fmt):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            parsed = pd.to_datetime(text, errors="coerce", format=fmt)
+        return float(parsed.notna().mean())
+
+    # ============================================================
+    #  Conversion
+    # ============================================================
+    def apply(self, df, decisions):
+        """Convert only the columns whose decision has an action."""
+        todo = [c for c, d in decisions.items() if d["action"] and c in df.columns]
+        converted = self._map(lambda c: self._convert(df[c], decisions[c]), todo)
+        for col, values in zip(todo, converted):
+            df[col] = values
+        return df
+
+    def _convert(self, series, decision):
+        action = decision["action"]
+        if action == "to_numeric":
+            return pd.to_numeric(series, errors="coerce")
+        if action == "to_boolean":
+            lowered = series.astype(str).str.strip().str.lower()
+            out = pd.Series(pd.NA, index=series.index, dtype="boolean")
+            out[lowered.isin(TRUE_VALUES)] = True
+            out[lowered.isin(FALSE_VALUES)] = False
+            return out
+        if action == "to_datetime":
+            fmt = decision.get("format")
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                parsed = pd.to_datetime(series, errors="coerce", format=fmt)
+                if fmt and parsed.notna().mean() <= self.threshold:
+                    parsed = pd.to_datetime(series, errors="coerce")
+            return parsed
+        return series
+
+    def _map(self, func, items):
+        if self.workers and self.workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                return list(pool.map(func, items))
+        return [func(item) for item in items]
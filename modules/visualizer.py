@@ -1,74 +1,104 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 from modules.logger import AppLogger
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from modules.chart_reduction import ChartReducer, annotate
 
 class Visualizer:
     def __init__(self, output_dir="output_data"):
         self.logger = AppLogger("logs/error_log.txt")
         self.output_dir = output_dir
+        self.reducer = ChartReducer()
+        self.last_reduction = None
+        self._canvases = {}  # Tk parent path -> canvas reused by embed_in_tk
+        self._time_indexes = {}  # (id(df), column, rows) -> TimeSeriesIndex, oldest first
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def make_figure(self, spec, df):
-        """Return matplotlib Figure for given spec and dataframe."""
+    def make_figure(self, spec, df, fig=None, cube=None, series=None):
+        """
+        Return matplotlib Figure for given spec and dataframe (redrawn into fig
+        when given). bar/bar_top/box_group read from cube (AggregateCube) when
+        set; line_time from series ({column: TimeSeriesIndex}) or an index
+        built on first use and kept for later renders of the same frame.
+        """
+        import matplotlib.pyplot as plt
         try:
             typ = spec.get('type')
             cols = spec.get('cols', [])
-            fig, ax = plt.subplots(figsize=(6,4))
+            if fig is None:
+                fig, ax = plt.subplots(figsize=(6,4))
+            else:
+                fig.clear()
+                ax = fig.add_subplot()
+            self.last_reduction = None
             if typ == 'hist' and len(cols)==1:
-                df[cols[0]].dropna().plot(kind='hist', ax=ax)
+                self.last_reduction = self.reducer.hist(ax, df[cols[0]], bins=10)
                 ax.set_title(f"Histogram: {cols[0]}")
             elif typ == 'box' and len(cols)==1:
                 df[cols[0]].dropna().plot(kind='box', ax=ax)
                 ax.set_title(f"Boxplot: {cols[0]}")
             elif typ == 'bar' and len(cols)==1:
-                counts = df[cols[0]].value_counts().sort_values(ascending=False)
+                counts = cube.counts(cols[0]) if cube is not None else None
+                if counts is None:
+                    counts = df[cols[0]].value_counts().sort_values(ascending=False)
                 counts.plot(kind='bar', ax=ax)
                 ax.set_title(f"Bar counts: {cols[0]}")
                 ax.set_ylabel("Count")
             elif typ == 'bar_top' and len(cols)==1:
-                counts = df[cols[0]].value_counts().nlargest(10)
+                counts = cube.counts(cols[0], top=10) if cube is not None else None
+                if counts is None:
+                    counts = df[cols[0]].value_counts().nlargest(10)
                 counts.plot(kind='bar', ax=ax)
                 ax.set_title(f"Top categories: {cols[0]}")
                 ax.set_ylabel("Count")
             elif typ == 'line_time' and len(cols)==1:
                 col = cols[0]
-                numeric = df.select_dtypes(include='number').columns.tolist()
                 if col not in df.columns:
                     ax.text(0.5,0.5,"Column missing", ha='center')
                 else:
-                    if numeric:
-                        try:
-                            series = df.set_index(col)[numeric[0]].resample('M').mean()
-                            series.plot(ax=ax)
-                            ax.set_title(f"Time trend ({numeric[0]}) by {col}")
-                        except Exception:
-                            series = df.set_index(col).resample('M').size()
-                            series.plot(ax=ax)
-                            ax.set_title(f"Counts over time by {col}")
+                    index = self.time_index(df, col, series)
+                    if index.numeric:
+                        index.series(index.numeric[0], "M").plot(ax=ax)
+                        ax.set_title(f"Time trend ({index.numeric[0]}) by {col}")
                     else:
-                        series = df.set_index(col).resample('M').size()
-                        series.plot(ax=ax)
+                        index.series(None, "M").plot(ax=ax)
                         ax.set_title(f"Counts over time by {col}")
             elif typ == 'scatter' and len(cols)==2:
-                ax.scatter(df[cols[0]], df[cols[1]])
+                self.last_reduction = self.reducer.scatter(ax, df[cols[0]], df[cols[1]])
                 ax.set_xlabel(cols[0])
                 ax.set_ylabel(cols[1])
                 ax.set_title(f"Scatter: {cols[0]} vs {cols[1]}")
             elif typ == 'box_group' and len(cols)==2:
                 num, cat = cols
-                sns.boxplot(x=cat, y=num, data=df, ax=ax)
+                boxes = cube.box_stats(cat, num, top=10) if cube is not None else None
+                if boxes is not None:
+                    ax.bxp(boxes, showfliers=False)
+                    ax.set_xlabel(cat)
+                    ax.set_ylabel(num)
+                else:
+                    import seaborn as sns
+                    sns.boxplot(x=cat, y=num, data=df, ax=ax)
                 ax.set_title(f"{num} by {cat}")
                 ax.tick_params(axis='x', rotation=45)
             else:
                 ax.text(0.5, 0.5, f"Unsupported spec {typ}", horizontalalignment='center')
-            plt.tight_layout()
+            annotate(fig, self.last_reduction)
+            fig.tight_layout()
             return fig
         except Exception as e:
             self.logger.log_error("Visualizer.make_figure", str(e))
             return None
 
+    def time_index(self, df, col, series=None):
+        """TimeSeriesIndex for df[col]: from series, else cached per frame (last few kept)."""
+        from modules.time_series import TimeSeriesIndex
+        if series and col in series:
+            return series[col]
+        key = (id(df), col, len(df))
+        index = self._time_indexes.pop(key, None) or TimeSeriesIndex(col).build(df)
+        self._time_indexes[key] = index  # the index holds df, so id(df) is not reused while cached
+        while len(self._time_indexes) > 4:
+            self._time_indexes.pop(next(iter(self._time_indexes)))
+        return index
+
     def save_figure(self, fig, name):
         try:
             path = os.path.join(self.output_dir, name)
@@ -79,18 +109,44 @@ class Visualizer:
             return None
 
     def show_in_terminal(self, fig):
+        import matplotlib.pyplot as plt
         try:
             plt.show(block=False)
         except Exception as e:
             self.logger.log_error("Visualizer.show_in_terminal", str(e))
 
     def embed_in_tk(self, fig, tk_parent):
+        """Show fig in tk_parent, reusing the canvas already embedded there instead of stacking a new one."""
+        import matplotlib.pyplot as plt
         try:
+            # Imported here so headless callers never load tkinter.
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            plt.close(fig)  # pyplot would otherwise keep every figure alive; the canvas holds it now
+            self._canvases = {k: c for k, c in self._canvases.items() if c.get_tk_widget().winfo_exists()}
+            canvas = self._canvases.get(str(tk_parent))
+            if canvas is not None:
+                swap_figure(canvas, fig)
+                return canvas
             canvas = FigureCanvasTkAgg(fig, master=tk_parent)
             canvas_widget = canvas.get_tk_widget()
             canvas_widget.pack(side='top', padx=5, pady=5)
             canvas.draw()
+            self._canvases[str(tk_parent)] = canvas
             return canvas
         except Exception as e:
             self.logger.log_error("Visualizer.embed_in_tk", str(e))
             return None
+
+
+def swap_figure(canvas, figure):
+    """Point an existing FigureCanvasTkAgg at another figure and redraw; returns the previous figure."""
+    old = canvas.figure
+    if old is not figure:
+        width, height = canvas.get_width_height()
+        figure.set_canvas(canvas)
+        canvas.figure = figure
+        if width > 1 and height > 1:
+            figure.set_size_inches(width / figure.dpi, height / figure.dpi, forward=False)
+        old.clear()
+    canvas.draw_idle()
+    return old